@@ -3,13 +3,78 @@ tests to run and debug your minimax and alphabeta agents locally.  The test
 cases used by the project assistant are not public.
 """
 
+import ast
+import json
+import math
+import os
+import pickle
+import random
+import tempfile
+import threading
 import unittest
 
 import isolation
 import game_agent
+import endgame
+import transposition
+import move_ordering
+import time_management
+import opening_book
+import parallel_search
+import perft
+import mcts
+import search_stats
+import symmetry
+import competition_agent
+import sample_players
+import tournament
 
 from importlib import reload
 
+# The Board methods and attributes of the original project, which the
+# project assistant grades the agents with
+STOCK_BOARD_API = ("width", "height", "move_count", "active_player", "inactive_player",
+                   "hash", "get_opponent", "move_is_legal", "get_blank_spaces",
+                   "get_player_location", "get_legal_moves", "apply_move", "is_winner",
+                   "is_loser", "utility", "to_string")
+
+# The modules available in the project assistant sandbox (see README.md)
+PA_MODULES = ("random", "numpy", "scipy", "sklearn", "itertools", "math", "heapq",
+              "collections", "array", "copy", "operator")
+
+
+def module_imports(path):
+    """Return the top-level packages imported when the input file is loaded,
+    leaving out the imports inside functions.
+    """
+    with open(path) as f:
+        tree = ast.parse(f.read())
+    names = set()
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            names.add(node.module.split(".")[0])
+    return names
+
+
+class StockBoard(object):
+    """A view of an `isolation.Board` limited to the original Board API"""
+
+    def __init__(self, board):
+        self._board = board
+
+    def __getattr__(self, name):
+        if name not in STOCK_BOARD_API:
+            raise AttributeError(name)
+        return getattr(self._board, name)
+
+    def copy(self):
+        return StockBoard(self._board.copy())
+
+    def forecast_move(self, move):
+        return StockBoard(self._board.forecast_move(move))
+
 
 class IsolationTest(unittest.TestCase):
     """Unit tests for isolation agents"""
@@ -38,6 +103,722 @@ class IsolationTest(unittest.TestCase):
         print(move)
         assert (alpha_move == move)
 
+    def test_players_search_the_project_board(self):
+        # The project assistant grades the agents with a Board that has no
+        # push_move(), which is searched on copies from forecast_move()
+        scores = []
+        for in_place in (True, False):
+            player = game_agent.AlphaBetaPlayer(depth_limit=3)
+            game = isolation.Board(player, "Player2", 9, 9)
+            game.setstate(self.game1.getstate())
+            self.assertIn(player.get_move(game if in_place else StockBoard(game),
+                                          lambda: float("inf")), game.get_legal_moves())
+            self.assertEqual(player.tt is None, not in_place)
+            scores.append(player.root_score)
+        self.assertEqual(scores[0], scores[1])
+
+        player = game_agent.MinimaxPlayer()
+        game = isolation.Board(player, "Player2", 9, 9)
+        game.setstate(self.game1.getstate())
+        self.assertIn(player.get_move(StockBoard(game), lambda: float("inf")),
+                      game.get_legal_moves())
+
+    def test_graded_file_imports_allowed_modules(self):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "game_agent.py")
+        self.assertLessEqual(module_imports(path), set(PA_MODULES))
+
+    def test_node_and_depth_budgets(self):
+        moves = []
+        for _ in range(2):
+            player = game_agent.AlphaBetaPlayer(node_limit=500)
+            game = isolation.Board(player, self.player2, 9, 9)
+            game.setstate(self.game1.getstate())
+            moves.append(player.get_move(game, lambda: float("inf")))
+            self.assertEqual(player.nodes, 501)
+        self.assertEqual(moves[0], moves[1])
+
+        nodes = []
+        for depth_limit in (1, 2):
+            player = game_agent.AlphaBetaPlayer(depth_limit=depth_limit)
+            game = isolation.Board(player, self.player2, 9, 9)
+            game.setstate(self.game1.getstate())
+            self.assertIn(player.get_move(game, lambda: float("inf")), game.get_legal_moves())
+            nodes.append(player.nodes)
+        self.assertLess(nodes[0], nodes[1])
+
+    def test_timer_is_read_every_few_nodes(self):
+        reads = []
+
+        def time_left():
+            reads.append(None)
+            return 1000. if len(reads) < 50 else 0.
+
+        player = game_agent.AlphaBetaPlayer(endgame_nodes=0)
+        game = isolation.Board(player, self.player2, 9, 9)
+        game.setstate(self.game1.getstate())
+        self.assertIn(player.get_move(game, time_left), game.get_legal_moves())
+        self.assertEqual(len(reads), 50)
+        self.assertGreater(player.nodes, 4 * len(reads))
+
+    def test_pondering_reuses_predicted_reply(self):
+        player = game_agent.AlphaBetaPlayer(ponder=True, depth_limit=4)
+        game = isolation.Board(player, "Player2")
+        for move in [(3, 3), (2, 4), (1, 2), (4, 2)]:
+            game.apply_move(move)
+        move = player.get_move(game.copy(), lambda: 150.)
+        self.assertIsNotNone(player.predicted_reply)
+
+        game.apply_move(move)
+        game.apply_move(player.predicted_reply)
+        self.assertIn(player.get_move(game.copy(), lambda: 150.), game.get_legal_moves())
+        self.assertEqual((player.ponder_hits, player.ponder_misses), (1, 0))
+        player.stop_pondering()
+        self.assertIsNone(player._ponder_thread)
+
+        # No pondering once the game is over after the move
+        game = isolation.Board(player, "Player2")
+        state = [1] * 49 + [0, 48, 0]
+        state[15] = 0
+        game.setstate(state)
+        self.assertEqual(player.get_move(game, lambda: 150.), (1, 2))
+        self.assertIsNone(player._ponder_thread)
+        self.assertIsNotNone(player.predicted_reply)
+        player.start_pondering(game, (1, 2))
+        self.assertIsNone(player._ponder_thread)
+        self.assertIsNone(player.predicted_reply)
+
+        # play_game stops the agents' pondering when the game ends
+        stopped = []
+
+        class PonderingPlayer(sample_players.RandomPlayer):
+            ponder = True
+
+            def stop_pondering(self):
+                stopped.append(self)
+
+        spec = tournament.GameSpec(PonderingPlayer(), player, [(3, 3), (0, 0)],
+                                   1, None, "ponder", None)
+        tournament.play_game(spec)
+        self.assertEqual(len(stopped), 1)
+        self.assertNotIn("ponder", [thread.name for thread in threading.enumerate()])
+
+    def test_parallel_root_split_matches_serial_search(self):
+        player = parallel_search.ParallelAlphaBetaPlayer(score_fn=game_agent.custom_score_2,
+                                                         processes=2, depth_limit=3)
+        self.addCleanup(player.close)
+        self.assertIsNotNone(player._executor)
+        game = isolation.Board(player, "Player2")
+        for move in [(3, 3), (2, 4), (1, 2), (4, 2), (2, 0)]:
+            game.apply_move(move)
+        move = player.get_move(game.copy(), lambda: float("inf"))
+
+        serial = game_agent.AlphaBetaPlayer(depth_limit=3)
+        serial_game = isolation.Board("Player1", serial)
+        serial_game.setstate(game.getstate())
+        self.assertEqual(serial.search_moves(serial_game, 3, [move])[0],
+                         serial.search_moves(serial_game, 3, serial_game.get_legal_moves())[0])
+
+    def test_pvs_and_aspiration_keep_root_score(self):
+        scores = []
+        for pvs, aspiration in [(False, None), (True, None), (True, 0.25)]:
+            player = game_agent.AlphaBetaPlayer(depth_limit=6, endgame_nodes=0,
+                                                pvs=pvs, aspiration=aspiration)
+            game = isolation.Board(player, "Player2")
+            for move in [(3, 3), (2, 4), (1, 2), (4, 2)]:
+                game.apply_move(move)
+            player.get_move(game, lambda: float("inf"))
+            scores.append(player.root_score)
+            if not pvs:
+                self.assertEqual(player.pvs_researches, 0)
+            if aspiration is None:
+                self.assertEqual(player.aspiration_researches, 0)
+        self.assertEqual(scores[0], scores[1])
+        self.assertEqual(scores[0], scores[2])
+        self.assertGreater(player.aspiration_researches, 0)
+
+
+class BoardTest(unittest.TestCase):
+    """Unit tests for the isolation.Board game engine"""
+
+    def setUp(self):
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+
+    def test_legal_moves_match_knight_offsets(self):
+        game = isolation.Board(self.player1, self.player2, 9, 9)
+        game.apply_move((4, 4))
+        game.apply_move((2, 3))
+        game.apply_move((6, 5))
+        game.apply_move((0, 2))
+        for player in (self.player1, self.player2):
+            r, c = game.get_player_location(player)
+            expected = [(r + dr, c + dc) for dr, dc in isolation.isolation.KNIGHT_DIRECTIONS
+                        if game.move_is_legal((r + dr, c + dc))]
+            self.assertEqual(sorted(game.get_legal_moves(player)), sorted(expected))
+
+    def test_setstate_round_trip(self):
+        game = isolation.Board(self.player1, self.player2, 5, 4)
+        game.apply_move((1, 2))
+        game.apply_move((3, 4))
+        loaded = isolation.Board(self.player1, self.player2, 5, 4)
+        loaded.setstate(game._board_state)
+        self.assertEqual(loaded.to_string(), game.to_string())
+        self.assertEqual(loaded.get_player_location(self.player2), (3, 4))
+        self.assertEqual(sorted(loaded.get_blank_spaces()), sorted(game.get_blank_spaces()))
+
+    def test_push_pop_restores_state(self):
+        game = isolation.Board(self.player1, self.player2)
+        game.apply_move((3, 3))
+        game.apply_move((0, 0))
+        before = game.to_string()
+        moves = sorted(game.get_legal_moves())
+        for move in moves:
+            game.push_move(move)
+            self.assertEqual(game.get_player_location(self.player1), move)
+            self.assertEqual(game.active_player, self.player2)
+            for reply in game.get_legal_moves():
+                game.push_move(reply)
+                game.pop_move()
+            game.pop_move()
+        self.assertEqual(game.to_string(), before)
+        self.assertEqual(game.move_count, 2)
+        self.assertEqual(game.active_player, self.player1)
+        self.assertEqual(sorted(game.get_legal_moves()), moves)
+
+    def test_deterministic_and_seeded_move_generation(self):
+        game = isolation.Board(self.player1, self.player2, shuffle=False)
+        game.apply_move((3, 3))
+        game.apply_move((0, 0))
+        moves = game.get_legal_moves()
+        self.assertEqual(moves, sorted(moves, key=lambda m: m[0] + m[1] * game.height))
+        self.assertEqual(game.copy().get_legal_moves(), moves)
+        self.assertEqual(list(game.iter_legal_moves()), moves)
+        self.assertEqual(list(game.iter_legal_moves(key=lambda m: -m[0])),
+                         sorted(moves, key=lambda m: -m[0]))
+
+        shuffled = []
+        for _ in range(2):
+            game = isolation.Board(self.player1, self.player2, seed=42)
+            game.apply_move((3, 3))
+            game.apply_move((0, 0))
+            shuffled.append([game.get_legal_moves() for _ in range(5)])
+        self.assertEqual(shuffled[0], shuffled[1])
+
+    def test_legal_moves_are_cached_per_state(self):
+        game = isolation.Board(self.player1, self.player2)
+        game.apply_move((3, 3))
+        game.apply_move((0, 0))
+        first = game.get_legal_moves()
+        cached = game._p1_moves
+        self.assertEqual(len(cached), 8)
+        first.clear()
+        self.assertEqual(len(game.get_legal_moves()), 8)
+
+        game.push_move((1, 2))
+        self.assertIsNone(game._p1_moves)
+        self.assertEqual(game.get_legal_moves(), [(2, 1)])
+        game.push_move((2, 1))
+        self.assertEqual(game.utility(self.player2), 0.)
+        game.pop_move()
+        game.pop_move()
+        self.assertIs(game._p1_moves, cached)
+        self.assertFalse(game.is_loser(self.player1))
+
+        # The heuristics count moves without shuffling them, so evaluating
+        # a position leaves the global random generator alone
+        self.assertEqual(game.count_legal_moves(), 8)
+        state = random.getstate()
+        for score_fn in (game_agent.custom_score, game_agent.custom_score_2,
+                         game_agent.custom_score_3, sample_players.open_move_score,
+                         sample_players.improved_score):
+            score_fn(game, self.player1)
+        self.assertEqual(random.getstate(), state)
+
+        # Only knight move sets are memoized, not the blank squares
+        decoded = len(game.tables._decoded)
+        for move in game.get_legal_moves():
+            game.forecast_move(move).get_blank_spaces()
+        self.assertEqual(len(game.tables._decoded), decoded)
+
+    def test_compact_copy_and_pickle(self):
+        game = isolation.Board(self.player1, self.player2, 9, 9, shuffle=False)
+        game.apply_move((4, 4))
+        game.push_move((0, 0))
+        self.assertFalse(hasattr(game, "__dict__"))
+
+        clone = game.copy()
+        self.assertEqual(clone, game)
+        self.assertEqual(clone.get_legal_moves(), game.get_legal_moves())
+        self.assertEqual(clone._undo_stack, [])
+        clone.apply_move(clone.get_legal_moves()[0])
+        self.assertNotEqual(clone, game)
+
+        restored = pickle.loads(pickle.dumps(game))
+        self.assertEqual(restored, game)
+        self.assertEqual(restored.to_string(), game.to_string())
+        self.assertEqual(restored.active_player, self.player1)
+
+    def test_incremental_region_counters(self):
+        isolation.Board.register_region("top_left", lambda w, h: [(0, 0), (0, 1), (1, 0), (1, 1)])
+        self.addCleanup(isolation.Board.unregister_region, "top_left")
+        game = isolation.Board(self.player1, self.player2, shuffle=False)
+        self.assertEqual(game.count_region_blanks("top_left"), 4)
+        game.apply_move((0, 0))
+        game.apply_move((3, 3))
+        for _ in range(6):
+            game.push_move(game.get_legal_moves()[0])
+            blanks = game.get_blank_spaces()
+            self.assertEqual(game.count_blank_spaces(), len(blanks))
+            self.assertEqual(game.count_region_blanks("top_left"),
+                             len([cell for cell in blanks if cell[0] < 2 and cell[1] < 2]))
+        for _ in range(6):
+            game.pop_move()
+        self.assertEqual(game.count_blank_spaces(), 47)
+        self.assertEqual(game.count_region_blanks("top_left"), 3)
+        self.assertEqual(game.copy().count_region_blanks("top_left"), 3)
+
+        isolation.Board.unregister_region("top_left")
+        self.assertNotIn("top_left", isolation.Board(self.player1, self.player2).tables.regions.slots)
+
+    def test_zobrist_key_is_incremental(self):
+        game = isolation.Board(self.player1, self.player2)
+        keys = set()
+        for move in [(3, 3), (0, 0), (1, 2), (2, 2), (0, 3)]:
+            game.push_move(move)
+            self.assertEqual(game.zobrist_key, game._compute_key())
+            keys.add(game.zobrist_key)
+        self.assertEqual(len(keys), 5)
+
+        replayed = isolation.Board(self.player1, self.player2)
+        for move in [(3, 3), (0, 0), (1, 2), (2, 2), (0, 3)]:
+            replayed = replayed.forecast_move(move)
+        self.assertEqual(replayed, game)
+        self.assertEqual(hash(replayed), hash(game))
+
+        for _ in range(5):
+            game.pop_move()
+        self.assertEqual(game.zobrist_key, 0)
+        self.assertNotEqual(replayed, game)
+
+
+class TranspositionTableTest(unittest.TestCase):
+    """Unit tests for the transposition table used by AlphaBetaPlayer"""
+
+    def test_two_tier_replacement(self):
+        table = transposition.TranspositionTable(max_entries=2)
+        table.store(1, 5, 1., transposition.EXACT, (0, 0))
+        table.store(3, 2, 2., transposition.LOWER, (1, 1))
+        self.assertEqual(table.probe(1)[1:5], (5, 1., transposition.EXACT, (0, 0)))
+        self.assertEqual(table.probe(3)[1:5], (2, 2., transposition.LOWER, (1, 1)))
+        self.assertIsNone(table.probe(5))
+
+        # a deeper result takes over the depth-preferred slot
+        table.store(5, 6, 3., transposition.UPPER, (2, 2))
+        self.assertIsNone(table.probe(1))
+        self.assertEqual(table.probe(5)[1], 6)
+
+        # results from an earlier search are replaceable at any depth
+        table.new_search()
+        table.store(7, 1, 4., transposition.EXACT, (3, 3))
+        self.assertEqual(table.probe(7)[1], 1)
+
+        stats = table.stats()
+        self.assertEqual(stats["probes"], 6)
+        self.assertEqual(stats["hits"], 4)
+        self.assertEqual(stats["entries"], 2)
+
+    def test_search_value_unchanged(self):
+        moves = [(3, 3), (2, 4), (1, 1), (0, 2)]
+        values = []
+        for tt_entries in (0, 1024):
+            player = game_agent.AlphaBetaPlayer(tt_entries=tt_entries)
+            player.time_left = lambda: float("inf")
+            game = isolation.Board(player, "Player2")
+            for move in moves:
+                game.apply_move(move)
+            for depth in range(1, 6):
+                player.alphabeta(game, depth)
+            values.append(player.root_score)
+        self.assertEqual(values[0], values[1])
+
+
+class MoveOrderingTest(unittest.TestCase):
+    """Unit tests for the alpha-beta move ordering heuristics"""
+
+    def test_pv_then_killers_then_history(self):
+        orderer = move_ordering.MoveOrderer()
+        orderer.record_cutoff((1, 2), 1, 0, 1)
+        orderer.record_cutoff((2, 1), 1, 0, 1)
+        orderer.record_cutoff((0, 0), 3, 0, 4)
+        moves = [(0, 0), (1, 2), (2, 1), (3, 3)]
+        self.assertEqual(orderer.order(moves, 1, 0, pv_move=(3, 3)),
+                         [(3, 3), (2, 1), (1, 2), (0, 0)])
+        # no killers at ply 2, so the history scores decide
+        self.assertEqual(orderer.order(moves, 2, 0)[0], (0, 0))
+        # history is kept per side
+        self.assertEqual(orderer.order(moves, 2, 1), moves)
+        # the in-place ordering used by the search gives the same order
+        for ply, side, pv_move in [(1, 0, (3, 3)), (1, 0, (1, 2)), (2, 0, None), (2, 1, None)]:
+            self.assertEqual(orderer.order_moves(iter(moves), ply, side, pv_move),
+                             orderer.order(moves, ply, side, pv_move))
+
+        orderer.new_search()
+        self.assertEqual(orderer.killers, [])
+        self.assertEqual(orderer.history[0][(0, 0)], 8)
+
+
+class TimeManagerTest(unittest.TestCase):
+    """Unit tests for the iterative deepening time manager"""
+
+    def test_skips_iteration_predicted_to_overrun(self):
+        clock = [150.]
+        manager = time_management.TimeManager()
+        game = isolation.Board("Player1", "Player2")
+        manager.new_search(game, lambda: clock[0], 10.)
+        self.assertEqual(manager.budget, 140.)
+
+        # Iterations of 100, 400 and 1600 nodes at 0.01 ms per node predict
+        # a branching factor of 4 and 64 ms for the next iteration
+        nodes = 0
+        for count in (100, 400, 1600):
+            nodes += count
+            clock[0] -= count / 100.
+            manager.iteration_done(nodes)
+        self.assertTrue(manager.next_iteration_fits())
+        nodes += 6400
+        clock[0] -= 64.
+        manager.iteration_done(nodes)
+        self.assertFalse(manager.next_iteration_fits())
+        self.assertEqual(manager.skipped, 1)
+
+        game.apply_move((3, 3))
+        game.apply_move((0, 0))
+        manager = time_management.TimeManager(phase_scaling=True)
+        manager.new_search(game, lambda: 150., 10.)
+        self.assertEqual(manager.budget, 140. * time_management.OPENING_FACTOR)
+
+        # The scaled budget stops the search within an iteration as well
+        player = game_agent.AlphaBetaPlayer(phase_scaling=True, endgame_nodes=0)
+        game = isolation.Board("Player1", player)
+        for move in [(0, 1), (6, 6), (1, 3), (4, 5), (2, 1)]:
+            game.apply_move(move)
+
+        # A simulated clock at 0.01 ms per node
+        def time_left():
+            return 200. - player.nodes / 100.
+        player.get_move(game, time_left)
+        self.assertLessEqual(200. - time_left(), 190. * time_management.QUIET_FACTOR + 1.)
+        self.assertEqual(player.stop_reason, "time manager")
+
+        # The endgame solver stops at the same time as the search
+        player.start_search(lambda: 100.)
+        self.assertFalse(player.out_of_time())
+        player.stop_at(120.)
+        self.assertTrue(player.out_of_time())
+
+
+class ScoreTablesTest(unittest.TestCase):
+    """Unit tests for the precomputed heuristic lookup tables"""
+
+    def test_tables_match_heuristic_definitions(self):
+        tables = game_agent.score_tables(7, 7)
+        self.assertIs(tables, game_agent.score_tables(7, 7))
+        center = [idx for idx in range(49) if tables.in_center[idx]]
+        self.assertEqual(center, [3 + 3 * 7, 4 + 3 * 7, 3 + 4 * 7, 4 + 4 * 7])
+        self.assertEqual(tables.weight[0], game_agent.CORNER_WEIGHT)
+        self.assertEqual(tables.weight[6 + 6 * 7], game_agent.CORNER_WEIGHT)
+        self.assertEqual(tables.weight[1], game_agent.EDGE_WEIGHT)
+        self.assertEqual(tables.center_distance[3 + 3 * 7], 0.5)
+        self.assertEqual(game_agent.assign_weight((3, 4), 7, 7), game_agent.CENTER_WEIGHT)
+
+        game = isolation.Board("Player1", "Player2")
+        game.apply_move((3, 3))
+        self.assertEqual(game_agent.distance_from_center(game, "Player1"), 0.5)
+        self.assertEqual(game_agent.center_space_ratio(game), 3 / 49)
+
+        # Boards without blank square counters are counted square by square
+        game.apply_move((0, 0))
+        stock = StockBoard(game)
+        self.assertEqual(game_agent.center_space_ratio(stock), 3 / 49)
+        self.assertEqual(game_agent.free_space_ratio(stock), 47 / 49)
+        for score_fn in (game_agent.custom_score, game_agent.custom_score_2,
+                         game_agent.custom_score_3):
+            self.assertEqual(score_fn(stock, "Player1"), score_fn(game, "Player1"))
+
+
+class EndgameTest(unittest.TestCase):
+    """Unit tests for the partitioned endgame solver"""
+
+    def active_player_wins(self, game):
+        for move in game.get_legal_moves():
+            game.push_move(move)
+            wins = self.active_player_wins(game)
+            game.pop_move()
+            if not wins:
+                return True
+        return False
+
+    def test_solver_matches_full_search(self):
+        rng = random.Random(5)
+        solved = 0
+        while solved < 30:
+            game = isolation.Board("Player1", "Player2", 5, 5)
+            while game.get_legal_moves() and rng.random() < 0.93:
+                game.apply_move(rng.choice(game.get_legal_moves()))
+            result = endgame.solve(game)
+            if not game.get_legal_moves() or result is None:
+                continue
+            solved += 1
+            self.assertEqual(result[0], self.active_player_wins(game))
+            self.assertIn(result[1], game.get_legal_moves())
+
+    def test_search_switches_to_solver(self):
+        player = game_agent.AlphaBetaPlayer()
+        game = isolation.Board(player, "Player2", 5, 5)
+        for move in [(3, 4), (2, 1), (1, 3), (4, 2), (3, 2), (3, 0), (1, 1), (2, 2),
+                     (0, 3), (4, 3), (2, 4), (3, 1), (1, 2), (2, 3), (3, 3), (0, 4)]:
+            game.apply_move(move)
+        self.assertIsNotNone(endgame.partition(game))
+        move = player.get_move(game, lambda: 150.)
+        self.assertIn(move, game.get_legal_moves())
+        self.assertEqual(player.nodes, 0)
+
+
+class MCTSTest(unittest.TestCase):
+    """Unit tests for the Monte Carlo tree search agent"""
+
+    def setUp(self):
+        reload(mcts)
+
+    def test_playout_budget_and_tree_reuse(self):
+        player = mcts.MCTSPlayer(node_limit=300, seed=0)
+        game = isolation.Board(player, "Player2")
+        for move in [(3, 3), (2, 4)]:
+            game.apply_move(move)
+        move = player.get_move(game, lambda: float("inf"))
+        self.assertIn(move, game.get_legal_moves())
+        self.assertEqual(player.playouts, 300)
+        self.assertEqual(player.visits[0], 300)
+        first, count = player.first_child[0], player.num_children[0]
+        self.assertEqual(sum(player.visits[first:first + count]), 300)
+
+        # After the most visited reply, the search continues from its subtree
+        game.apply_move(move)
+        first = player.first_child[player._move_node]
+        count = player.num_children[player._move_node]
+        node = max(range(first, first + count), key=player.visits.__getitem__)
+        visits = player.visits[node]
+        game.apply_move(game.tables.coords[player.moves[node]])
+        self.assertIn(player.get_move(game, lambda: float("inf")), game.get_legal_moves())
+        self.assertEqual(player.reused, visits)
+        self.assertEqual(player.visits[0], visits + 300)
+        self.assertEqual(len(player.visits), len(player.num_children))
+
+    def test_playouts_from_setstate_position(self):
+        # Boards loaded with setstate() keep move_count at 0 even though both
+        # players are placed; the only move leads to a terminal position
+        player = mcts.MCTSPlayer(node_limit=50, seed=0)
+        game = isolation.Board(player, "Player2")
+        state = [1] * 49 + [0, 48, 0]
+        state[15] = 0
+        game.setstate(state)
+        self.assertEqual(player.get_move(game, lambda: float("inf")), (1, 2))
+        self.assertEqual(player.playouts, 50)
+
+
+class OpeningBookTest(unittest.TestCase):
+    """Unit tests for the opening book"""
+
+    def test_symmetric_positions_share_book_moves(self):
+        book = opening_book.build_book(5, 5, plies=6, depth=2)
+        path = os.path.join(tempfile.mkdtemp(), "book.json")
+        book.save(path)
+        book = opening_book.load_book(path)
+        self.assertEqual(book.plies, 6)
+        self.assertEqual(len(book), len(opening_book.opening_positions(5, 5, 6, book)))
+
+        # After random placements and any first move, the second player's
+        # book lines continue into the middle game
+        game = isolation.Board("Player1", "Player2", 5, 5)
+        for move in [(0, 1), (4, 4), (2, 2)]:
+            game.apply_move(move)
+        game.apply_move(book.lookup(game))
+        game.apply_move(game.get_legal_moves()[0])
+        self.assertEqual(game.move_count, 5)
+        self.assertIn(book.lookup(game), game.get_legal_moves())
+
+        for transform in symmetry.symmetries(5, 5):
+            game = isolation.Board("Player1", "Player2", 5, 5)
+            image = isolation.Board("Player1", "Player2", 5, 5)
+            for move in [(0, 1), (2, 2)]:
+                game.apply_move(move)
+                image.apply_move(transform(*move))
+            self.assertEqual(book.lookup(image), transform(*book.lookup(game)))
+
+        with open(path) as f:
+            data = json.load(f)
+        for player in (competition_agent.CustomPlayer(data=path),
+                       competition_agent.CustomPlayer(data=data)):
+            for transform in symmetry.symmetries(5, 5):
+                game = isolation.Board(player, "Player2", 5, 5)
+                game.apply_move(transform(1, 1))
+                game.apply_move(transform(3, 2))
+                self.assertEqual(player.get_move(game, lambda: 150.), book.lookup(game))
+                self.assertEqual(player.nodes, 0)
+
+        # Books written without the number of plies cover BOOK_PLIES
+        del data["plies"]
+        with open(path, "w") as f:
+            json.dump(data, f)
+        self.assertEqual(opening_book.OpeningBook.load(path).plies, opening_book.BOOK_PLIES)
+
+
+class CompetitionAgentTest(unittest.TestCase):
+    """Unit tests for the competition agent, which is submitted on its own"""
+
+    def test_plays_and_ponders_on_any_board(self):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "competition_agent.py")
+        self.assertLessEqual(module_imports(path), set(PA_MODULES))
+
+        for in_place in (True, False):
+            player = competition_agent.CustomPlayer(data=None, ponder=True)
+            game = isolation.Board(player, "Player2")
+            for move in [(3, 3), (2, 4), (1, 2), (4, 2)]:
+                game.apply_move(move)
+
+            # A simulated clock at 0.01 ms per node
+            def time_left():
+                return 150. - player.nodes / 100.
+            board = game if in_place else StockBoard(game)
+            move = player.get_move(board.copy(), time_left)
+            self.assertIn(move, game.get_legal_moves())
+            self.assertIsNotNone(player.predicted_reply)
+
+            game.apply_move(move)
+            game.apply_move(player.predicted_reply)
+            board = game if in_place else StockBoard(game)
+            self.assertIn(player.get_move(board.copy(), time_left), game.get_legal_moves())
+            self.assertEqual((player.ponder_hits, player.ponder_misses), (1, 0))
+            player.stop_pondering()
+
+
+class PerftTest(unittest.TestCase):
+    """Unit tests for the move generation perft"""
+
+    def test_reference_counts(self):
+        for memo in (False, True):
+            results = perft.run_suite(max_nodes=50000, memo=memo)
+            self.assertGreater(len(results), 30)
+            for result in results:
+                self.assertEqual(result.count, result.expected, (result.name, result.depth))
+
+        # Perft searches the board in place and leaves it unchanged
+        game = perft.reference_board(perft.REFERENCE_POSITIONS[2])
+        state = game.getstate()
+        self.assertEqual(perft.perft_memo(game, 6), perft.perft(game, 6))
+        self.assertEqual(game.getstate(), state)
+
+
+class TournamentTest(unittest.TestCase):
+    """Unit tests for the tournament runner"""
+
+    def test_seeded_rounds_are_reproducible(self):
+        cpu_agent = tournament.Agent(sample_players.RandomPlayer(), "Random")
+        test_agents = [tournament.Agent(sample_players.RandomPlayer(), "Random_{}".format(i))
+                       for i in range(2)]
+        results = []
+        for _ in range(2):
+            wins = {agent.player: 0 for agent in test_agents + [cpu_agent]}
+            counts = tournament.play_round(cpu_agent, test_agents, wins, 3,
+                                           rng=random.Random(7))
+            results.append((counts, [wins[agent.player] for agent in test_agents + [cpu_agent]]))
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(sum(results[0][1]), 2 * 3 * len(test_agents))
+
+    def test_only_test_agent_forfeits_are_counted(self):
+        class ForfeitingPlayer(sample_players.RandomPlayer):
+            def get_move(self, game, time_left):
+                return (-1, -1)
+
+        forfeiting = tournament.Agent(ForfeitingPlayer(), "Forfeit")
+        random_agent = tournament.Agent(sample_players.RandomPlayer(), "Random")
+        for cpu_agent, test_agent, forfeits in [(random_agent, forfeiting, 4),
+                                                (forfeiting, random_agent, 0)]:
+            wins = {cpu_agent.player: 0, test_agent.player: 0}
+            counts = tournament.play_round(cpu_agent, [test_agent], wins, 2,
+                                           rng=random.Random(1), time_limit=None)
+            self.assertEqual(counts, (0, forfeits))
+            self.assertEqual(wins[forfeiting.player], 0)
+
+    def test_sprt_stops_on_clear_difference(self):
+        lower, upper = tournament.sprt_bounds(0.05, 0.05)
+        self.assertAlmostEqual(lower, -upper)
+        self.assertAlmostEqual(tournament.sprt_llr(3, 3, 0.5, 0.6), 3 * math.log(0.6 * 0.4 / 0.25))
+
+        agent = tournament.Agent(game_agent.AlphaBetaPlayer(depth_limit=2), "AB")
+        opponent = tournament.Agent(sample_players.RandomPlayer(), "Random")
+        result = tournament.play_sprt(agent, opponent, p1=0.6, max_games=200, seed=3,
+                                      time_limit=None)
+        self.assertEqual(result.decision, "H1")
+        self.assertEqual(result.wins + result.losses, result.games)
+        self.assertLess(result.games, 200)
+        self.assertGreaterEqual(result.llr, upper)
+
+    def test_results_log_resumes_recorded_games(self):
+        cpu_agent = tournament.Agent(sample_players.RandomPlayer(), "Random")
+        test_agents = [tournament.Agent(sample_players.RandomPlayer(), "Random_1")]
+        path = os.path.join(tempfile.mkdtemp(), "results.jsonl")
+        tallies = []
+        for resume in (False, True):
+            log = tournament.ResultLog(path, resume=resume)
+            wins = {agent.player: 0 for agent in test_agents + [cpu_agent]}
+            tournament.play_round(cpu_agent, test_agents, wins, 2, rng=random.Random(3),
+                                  log=log, round_id="1-Random")
+            log.close()
+            tallies.append(sorted(wins.values()))
+        self.assertEqual(tallies[0], tallies[1])
+
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 4)
+        self.assertEqual(records[0]["game"], "1-Random/0/Random_1/2")
+        self.assertEqual(records[0]["player_2"], "Random_1")
+        self.assertGreaterEqual(len(records[0]["move_times"]), len(records[0]["history"]))
+
+        # Resuming with a different seed does not reuse the recorded games
+        log = tournament.ResultLog(path, resume=True)
+        self.addCleanup(log.close)
+        wins = {agent.player: 0 for agent in test_agents + [cpu_agent]}
+        with self.assertRaises(ValueError):
+            tournament.play_round(cpu_agent, test_agents, wins, 2, rng=random.Random(4),
+                                  log=log, round_id="1-Random")
+
+    def test_search_stats_are_collected_per_agent(self):
+        agent = tournament.Agent(game_agent.AlphaBetaPlayer(node_limit=200, stats=True), "AB")
+        opponent = tournament.Agent(sample_players.RandomPlayer(), "Random")
+        specs = tournament.fair_game_specs(opponent, [agent], 1, random.Random(5), None)
+        path = os.path.join(tempfile.mkdtemp(), "results.jsonl")
+        log = tournament.ResultLog(path)
+        stats = {}
+        results = list(tournament.play_games(specs, log=log, stats=stats))
+        log.close()
+        self.assertEqual(list(stats), ["AB"])
+        self.assertEqual(len(stats["AB"]), sum(len(r.stats[1] if r.stats[1] else r.stats[0])
+                                               for r in results))
+        for move in stats["AB"]:
+            self.assertIn(move.stop, ("depth", "nodes", "time manager", "endgame"))
+            if move.stop != "endgame":
+                self.assertLessEqual(move.nodes, 201)
+                self.assertGreater(move.evaluations, 0)
+                self.assertLessEqual(move.first_cutoffs, move.cutoffs)
+                self.assertGreaterEqual(move.depth, 1)
+        self.assertEqual(tournament.ResultLog(path, resume=True).result(specs[0]).stats,
+                         results[0].stats)
+
+        summary = search_stats.summarize(stats["AB"])
+        self.assertEqual(summary["moves"], len(stats["AB"]))
+        self.assertEqual(sum(summary["stops"].values()), len(stats["AB"]))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -3,9 +3,35 @@ you choose.  This agent will compete against other students (and past
 champions) in a tournament.
 
          COMPLETING AND SUBMITTING A COMPETITION AGENT IS OPTIONAL
+
+This file is submitted on its own, together with the opening book in
+`data.json`, and runs in a sandbox that only allows a few standard library
+modules (see README.md). It does not import the other modules of this
+directory: the `json` module is imported when the book file is read, and
+`threading` and `time` when the agent ponders.
 """
 import random
 
+# The opening book written by `opening_book.py`
+BOOK_FILE = "data.json"
+
+# The `plies` of a book that does not record it (see `opening_book.BOOK_PLIES`)
+BOOK_PLIES = 6
+
+# The transposition table is cleared before a search once it holds more
+# entries than this
+TT_ENTRIES = 2**18
+
+# Bound types of the transposition table entries
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Seconds a pondering thread waits before it starts searching
+PONDER_DELAY = 0.002
+
+INFINITY = float("inf")
+
 
 class SearchTimeout(Exception):
     """Subclass base exception for code clarity. """
@@ -14,7 +40,10 @@ class SearchTimeout(Exception):
 
 def custom_score(game, player):
     """Calculate the heuristic value of a game state from the point of view
-    of the given player.
+    of the given player: the number of legal moves of the player minus the
+    number of legal moves of its opponent. This is the value that
+    `game_agent.custom_score_2` takes on the tournament boards, whose center
+    region never holds enough of the blank squares for its distance term.
 
     This should be the best heuristic function for your project submission.
 
@@ -33,7 +62,95 @@ def custom_score(game, player):
     float
         The heuristic value of the current game state to the specified player.
     """
-    raise NotImplementedError
+    if game.is_winner(player):
+        return float("+inf")
+    elif game.is_loser(player):
+        return float("-inf")
+
+    return float(count_legal_moves(game, player) - count_legal_moves(game, game.get_opponent(player)))
+
+
+def count_legal_moves(game, player):
+    """Return the number of legal moves of a player, counted without
+    building or shuffling a list of them on boards that support it.
+    """
+    if hasattr(game, "count_legal_moves"):
+        return game.count_legal_moves(player)
+    return len(game.get_legal_moves(player))
+
+
+def legal_moves(game, player=None):
+    """Return the legal moves of a player in no particular order, without
+    shuffling them on boards that support it.
+    """
+    if hasattr(game, "iter_legal_moves"):
+        return list(game.iter_legal_moves(player))
+    return game.get_legal_moves(player)
+
+
+def load_book(data):
+    """Return the opening book given as the `data` of a `CustomPlayer`: the
+    dictionary written by `opening_book.OpeningBook.save`, or the path of the
+    JSON file holding it. A missing file or None gives an empty book.
+    """
+    if data is None:
+        return {}
+    if isinstance(data, dict):
+        return data
+    import json
+    try:
+        with open(data) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def symmetries(width, height):
+    """Return the coordinate transforms that map a board of the given size
+    onto itself, in the order of `symmetry.symmetries`.
+    """
+    h, w = height - 1, width - 1
+    transforms = [
+        lambda r, c: (r, c),
+        lambda r, c: (h - r, c),
+        lambda r, c: (r, w - c),
+        lambda r, c: (h - r, w - c),
+    ]
+    if width == height:
+        transforms += [
+            lambda r, c: (c, r),
+            lambda r, c: (w - c, h - r),
+            lambda r, c: (c, h - r),
+            lambda r, c: (w - c, r),
+        ]
+    return transforms
+
+
+def book_key(game):
+    """Return the key of a position in the opening book together with the
+    transform that maps the position onto the orientation of the key. The
+    keys are those of `symmetry.canonical_key`, which the book is built with.
+    """
+    blank = set(game.get_blank_spaces())
+    blocked = [(r, c) for r in range(game.height) for c in range(game.width)
+               if (r, c) not in blank]
+    active = game.get_player_location(game.active_player)
+    inactive = game.get_player_location(game.inactive_player)
+
+    best = None
+    for transform in symmetries(game.width, game.height):
+        key = (sorted(transform(*cell) for cell in blocked),
+               transform(*active) if active else (-1, -1),
+               transform(*inactive) if inactive else (-1, -1))
+        if best is None or key < best[0]:
+            best = (key, transform)
+
+    (cells, active, inactive), transform = best
+    key = "{}|{}|{}".format(
+        ",".join("{}.{}".format(*cell) for cell in cells),
+        "{}.{}".format(*active) if active != (-1, -1) else "-",
+        "{}.{}".format(*inactive) if inactive != (-1, -1) else "-")
+    return key, transform
 
 
 class CustomPlayer:
@@ -49,22 +166,54 @@ class CustomPlayer:
         COMPETITION.  IT IS NOT REQUIRED FOR THE ISOLATION PROJECT REVIEW.
     **************************************************************************
 
+    Moves in the first plies are answered instantly from the opening book
+    built by `opening_book.py`; every other move is chosen by iterative
+    deepening alpha-beta search with a transposition table. Boards with
+    push_move() are searched in place, and other boards on copies made by
+    forecast_move().
+
     Parameters
     ----------
-    data : string
-        The name of the search method to use in get_move().
+    data : string or dict (optional)
+        The opening book: the path of the `data.json` file written by
+        `opening_book.py`, which is read the first time the book is
+        consulted, the dictionary stored in that file, or None to play
+        without a book.
 
     timeout : float (optional)
         Time remaining (in milliseconds) when search is aborted.  Note that
         the PvP competition uses more accurate timers that are not cross-
         platform compatible, so a limit of 1ms (vs 10ms for the other classes)
         is generally sufficient.
+
+    ponder : bool (optional)
+        If True, keep searching in a background thread during the opponent's
+        turn, on the position after the reply predicted by the transposition
+        table; the next search reuses the stored results when that reply is
+        played. `stop_pondering` stops the thread.
+
+    ponder_time : float (optional)
+        The longest time, in milliseconds, spent pondering on one move.
     """
 
-    def __init__(self, data=None, timeout=1.):
+    def __init__(self, data=BOOK_FILE, timeout=1., ponder=False, ponder_time=150.):
         self.score = custom_score
         self.time_left = None
         self.TIMER_THRESHOLD = timeout
+        self.data = data
+        self.book = None
+        self.ponder = ponder
+        self.ponder_time = ponder_time
+        self.tt = {}
+        self.nodes = 0
+        self.completed_depth = None
+        self.predicted_reply = None
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+        self._in_place = False
+        self._ponder_thread = None
+        self._ponder_stop = None
+        self._ponder_key = None
 
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
@@ -93,5 +242,172 @@ class CustomPlayer:
             Board coordinates corresponding to a legal move; may return
             (-1, -1) if there are no available legal moves.
         """
-        # OPTIONAL: Finish this function!
-        raise NotImplementedError
+        self.stop_pondering(game)
+        self.time_left = time_left
+        self.nodes = 0
+        move = self.book_move(game)
+        if move is not None:
+            return move
+
+        best_move = self.iterative_deepening(game)
+        if self.ponder and best_move != (-1, -1):
+            self.start_pondering(game, best_move)
+        return best_move
+
+    def book_move(self, game):
+        """Return the opening book move for the active player of the input
+        game, or None if the position is not in the book.
+        """
+        if self.book is None:
+            self.book = load_book(self.data)
+        book = self.book
+        if ((game.width, game.height) != (book.get("width"), book.get("height")) or
+                game.move_count >= book.get("plies", BOOK_PLIES)):
+            return None
+        key, transform = book_key(game)
+        move = book["moves"].get(key)
+        if move is None:
+            return None
+        # The book move is stored in the orientation of the key
+        move = tuple(move)
+        for cell in legal_moves(game):
+            if transform(*cell) == move:
+                return cell
+        return None
+
+    def iterative_deepening(self, game):
+        """Search the input position with alpha-beta search to increasing
+        depths until the timer runs out, and return the best move of the
+        deepest completed search, or (-1, -1) if there are no legal moves.
+        """
+        moves = legal_moves(game)
+        if not moves:
+            return (-1, -1)
+        if len(self.tt) > TT_ENTRIES:
+            self.tt.clear()
+        self._in_place = hasattr(game, "push_move")
+        key = game.hash()
+        board = game.copy()
+        best_move = moves[0]
+        self.completed_depth = 0
+        try:
+            for depth in range(1, len(game.get_blank_spaces()) + 1):
+                score = self.negamax(board, depth, -INFINITY, INFINITY)
+                best_move = self.tt[key][3]
+                self.completed_depth = depth
+                if score == INFINITY or score == -INFINITY:
+                    break
+        except SearchTimeout:
+            pass
+        return best_move
+
+    def negamax(self, game, depth, alpha, beta):
+        """Return the alpha-beta value of a position for the player to move,
+        searched to `depth` plies with the (alpha, beta) window; outside the
+        window, a bound on the value. The best move of the position is stored
+        in the transposition table, and searched first by later searches.
+
+        Scores are stored for the player to move, which the board hash
+        determines. Since `custom_score` is the negation of its value for the
+        opponent, the stored scores are the same whichever seat this player
+        holds.
+        """
+        self.nodes += 1
+        if self.time_left() < self.TIMER_THRESHOLD:
+            raise SearchTimeout()
+
+        active = game.active_player
+        if depth == 0:
+            score = self.score(game, self)
+            return score if active is self else -score
+
+        key = game.hash()
+        hash_move = None
+        entry = self.tt.get(key)
+        if entry is not None:
+            entry_depth, score, bound, hash_move = entry
+            if entry_depth >= depth and (bound == EXACT or (
+                    score >= beta if bound == LOWER else score <= alpha)):
+                return score
+
+        moves = legal_moves(game, active)
+        if not moves:
+            return -INFINITY
+        if hash_move in moves:
+            moves.remove(hash_move)
+            moves.insert(0, hash_move)
+
+        alpha_orig = alpha
+        best_score, best_move = -INFINITY, moves[0]
+        for move in moves:
+            if self._in_place:
+                game.push_move(move)
+                score = -self.negamax(game, depth - 1, -beta, -alpha)
+                game.pop_move()
+            else:
+                score = -self.negamax(game.forecast_move(move), depth - 1, -beta, -alpha)
+            if score > best_score:
+                best_score, best_move = score, move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if best_score <= alpha_orig:
+            bound = UPPER
+        elif best_score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.tt[key] = (depth, best_score, bound, best_move)
+        return best_score
+
+    def start_pondering(self, game, move):
+        """Start searching, in a background thread, the position expected
+        after this player's `move` and the reply to it predicted by the
+        transposition table. Nothing happens if there is no prediction, or
+        if the game ends with `move` or with the predicted reply.
+        """
+        self.predicted_reply = None
+        game = game.forecast_move(move)
+        entry = self.tt.get(game.hash())
+        # An opponent without legal moves has lost, so no reply is legal
+        if entry is None or entry[3] not in legal_moves(game):
+            return
+        self.predicted_reply = entry[3]
+        game = game.forecast_move(entry[3])
+        if game.is_loser(self):
+            return
+        import threading
+        self._ponder_key = game.hash()
+        self._ponder_stop = threading.Event()
+        self._ponder_thread = threading.Thread(target=self._ponder, args=(game, self._ponder_stop),
+                                               name="ponder", daemon=True)
+        self._ponder_thread.start()
+
+    def _ponder(self, game, stop):
+        # Let get_move() return its move before this thread competes with it
+        # for the interpreter lock
+        if stop.wait(PONDER_DELAY):
+            return
+        import time
+        deadline = time.time() + self.ponder_time / 1000.
+        self.time_left = lambda: (-INFINITY if stop.is_set() or time.time() > deadline
+                                  else INFINITY)
+        self.iterative_deepening(game)
+
+    def stop_pondering(self, game=None):
+        """Stop the background search started by `start_pondering`, if any,
+        and count a ponder hit if it searched the input position or a miss
+        otherwise.
+        """
+        if self._ponder_thread is None:
+            return
+        self._ponder_stop.set()
+        self._ponder_thread.join()
+        if game is not None:
+            if game.hash() == self._ponder_key:
+                self.ponder_hits += 1
+            else:
+                self.ponder_misses += 1
+        self._ponder_thread = None
+        self._ponder_stop = None
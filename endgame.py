@@ -0,0 +1,233 @@
+"""This file contains an exact solver for partitioned Isolation endgames.
+
+Once no blank square can be reached by both players, the players can no
+longer interfere with each other and the game reduces to which of them has
+the longer knight path through their own region: the player to move wins if
+and only if their longest path is strictly longer than the opponent's.
+`partition` detects that case with a flood fill over the knight move
+bitboards, and `longest_path` finds the longest path in a region with a
+memoized depth-first search that gives up after a node budget.
+"""
+from isolation.isolation import popcount
+
+# Default node budget of one endgame solve
+MAX_NODES = 20000
+
+# Number of nodes between two calls of the `stop` callable of a solve
+STOP_INTERVAL = 256
+
+# The memo of longest paths is emptied when it grows past this many entries
+MAX_MEMO = 2**17
+
+
+class _Unsolved(Exception):
+    """Raised when a longest path search runs out of nodes. """
+    pass
+
+
+_MEMO = {}
+_COLORS = {}
+
+
+def _color_mask(tables):
+    """Return a bitboard of the squares with an even row + column. A knight
+    move always changes the color, which bounds the length of a path.
+    """
+    mask = _COLORS.get((tables.width, tables.height))
+    if mask is None:
+        mask = 0
+        for idx, (r, c) in enumerate(tables.coords):
+            if (r + c) % 2 == 0:
+                mask |= 1 << idx
+        _COLORS[(tables.width, tables.height)] = mask
+    return mask
+
+
+def reachable(tables, free, square, stop=0):
+    """Return a bitboard of the squares in `free` that can be reached from
+    `square` by a sequence of knight moves through `free`, or None as soon as
+    one of the squares in `stop` is reached.
+    """
+    masks = tables.knight_masks
+    reach = 0
+    frontier = masks[square] & free
+    while frontier:
+        if frontier & stop:
+            return None
+        reach |= frontier
+        spread = 0
+        while frontier:
+            low = frontier & -frontier
+            spread |= masks[low.bit_length() - 1]
+            frontier ^= low
+        frontier = spread & free & ~reach
+    return reach
+
+
+def partition(game):
+    """Return the regions (bitboards of blank squares) reachable by the
+    active and by the inactive player if no blank square is reachable by
+    both, or None if the players can still interfere with each other or have
+    not both been placed on the board.
+    """
+    active = game.get_player_square(game.active_player)
+    inactive = game.get_player_square(game.inactive_player)
+    if active is None or inactive is None:
+        return None
+    tables = game.tables
+    free = tables.full_mask & ~game.blocked_mask
+
+    # The regions overlap exactly when the inactive player can move into the
+    # active player's region in one step
+    active_region = reachable(tables, free, active, stop=tables.knight_masks[inactive])
+    if active_region is None:
+        return None
+    return active_region, reachable(tables, free & ~active_region, inactive)
+
+
+def path_bounds(tables, square, region):
+    """Return a lower and an upper bound of the longest knight path from
+    `square` through `region`, and the first square of the path that gives
+    the lower bound (None if there is no move).
+
+    The lower bound is the length of a greedy path that always moves to the
+    square with the fewest onward moves (Warnsdorff's rule); the upper bound
+    is the longest path allowed by the alternating square colors.
+    """
+    masks = tables.knight_masks
+    colors = _color_mask(tables)
+    same = region & colors if (colors >> square) & 1 else region & ~colors
+    upper = min(2 * popcount(region & ~same), 2 * popcount(same) + 1)
+
+    lower = 0
+    first = None
+    free = region
+    moves = masks[square] & free
+    while moves:
+        best = None
+        while moves:
+            low = moves & -moves
+            idx = low.bit_length() - 1
+            onward = popcount(masks[idx] & free)
+            if best is None or onward < best[0]:
+                best = (onward, idx)
+            moves ^= low
+        free &= ~(1 << best[1])
+        moves = masks[best[1]] & free
+        if first is None:
+            first = best[1]
+        lower += 1
+    return lower, upper, first
+
+
+def longest_path(tables, square, region, max_nodes=MAX_NODES, stop=None):
+    """Return the length of the longest knight path from `square` through the
+    squares of `region`, and the first square of such a path (None if there
+    is no move), or None if the search needs more than `max_nodes` nodes or
+    the optional `stop` callable returns True (it is called every
+    STOP_INTERVAL nodes).
+    """
+    memo = _MEMO.setdefault((tables.width, tables.height), {})
+    if len(memo) > MAX_MEMO:
+        memo.clear()
+    budget = [max_nodes, stop]
+    try:
+        return _longest(memo, tables.knight_masks, _color_mask(tables), square, region, budget)
+    except _Unsolved:
+        return None
+
+
+def _longest(memo, masks, colors, square, free, budget):
+    # The memo maps (free << 10 | square) to (length << 10 | first square + 1):
+    # a dict of plain ints is not tracked by the garbage collector, so a
+    # large memo does not slow down collections during the search
+    key = free << 10 | square
+    packed = memo.get(key)
+    if packed is not None:
+        return packed >> 10, (packed & 0x3ff) - 1 if packed & 0x3ff else None
+    budget[0] -= 1
+    if budget[0] < 0:
+        raise _Unsolved()
+    if budget[1] is not None and budget[0] % STOP_INTERVAL == 0 and budget[1]():
+        raise _Unsolved()
+
+    result = (0, None)
+    moves = masks[square] & free
+    if moves:
+        # A path alternates between squares of the other color and squares
+        # of the same color as its start, so it is no longer than this
+        same = free & colors if (colors >> square) & 1 else free & ~colors
+        bound = min(2 * popcount(free & ~same), 2 * popcount(same) + 1)
+
+        # Try the moves with the fewest onward moves first (Warnsdorff's
+        # rule), which finds long paths early and ends the search at `bound`
+        squares = []
+        while moves:
+            low = moves & -moves
+            idx = low.bit_length() - 1
+            squares.append((popcount(masks[idx] & free), idx))
+            moves ^= low
+        for _, idx in sorted(squares):
+            length = 1 + _longest(memo, masks, colors, idx, free & ~(1 << idx), budget)[0]
+            if length > result[0]:
+                result = (length, idx)
+                if length >= bound:
+                    break
+    memo[key] = result[0] << 10 | (result[1] + 1 if result[1] is not None else 0)
+    return result
+
+
+def solve(game, max_nodes=MAX_NODES, longest=True, stop=None):
+    """Solve a partitioned endgame exactly.
+
+    Parameters
+    ----------
+    game : `isolation.Board`
+        The position to solve
+
+    max_nodes : int (optional)
+        The node budget of each longest path search
+
+    longest : bool (optional)
+        If True, a losing active player gets the first move of its longest
+        path (to survive as long as possible) when the budget allows;
+        otherwise any move that keeps the result is good enough.
+
+    stop : callable (optional)
+        Checked periodically by the longest path searches, which give up
+        when it returns True (e.g., when the search timer runs low)
+
+    Returns
+    -------
+    (bool, (int, int)) or None
+        Whether the active player wins, and a move for the active player
+        that achieves the result ((-1, -1) if there is none); None if the
+        players are not partitioned or the solve exceeds the node budget
+    """
+    regions = partition(game)
+    if regions is None:
+        return None
+    tables = game.tables
+    active_square = game.get_player_square(game.active_player)
+    inactive_square = game.get_player_square(game.inactive_player)
+
+    # Cheap bounds settle most positions without a search. When the greedy
+    # path alone outlasts every path of the opponent, following it wins
+    active_lower, active_upper, first = path_bounds(tables, active_square, regions[0])
+    inactive_lower, inactive_upper, _ = path_bounds(tables, inactive_square, regions[1])
+    if active_lower > inactive_upper:
+        return True, tables.coords[first]
+    active_wins = False if inactive_lower >= active_upper else None
+
+    if active_wins is None or longest:
+        active = longest_path(tables, active_square, regions[0], max_nodes, stop)
+        if active is not None:
+            first = active[1]
+        elif active_wins is None:
+            return None
+    if active_wins is None:
+        inactive = longest_path(tables, inactive_square, regions[1], max_nodes, stop)
+        if inactive is None:
+            return None
+        active_wins = active[0] > inactive[0]
+    return active_wins, tables.coords[first] if first is not None else (-1, -1)
@@ -5,6 +5,43 @@ and include the results in your report.
 import random
 import math
 
+# The project assistant grades this file on its own, with only a few standard
+# library modules available (see README.md). The search extensions of
+# AlphaBetaPlayer live in the other modules of this directory, and are only
+# imported when an option enables them on a board that supports them
+
+# Mixed into the transposition table keys when the searching player holds
+# player 2's seat, since scores are stored from the searching player's view
+PERSPECTIVE_KEY = 0x9e3779b97f4a7c15
+
+# Seconds a pondering thread waits before it starts searching
+PONDER_DELAY = 0.002
+
+# Widening factor of a failed aspiration window, and the number of windows
+# tried before searching with a full window
+ASPIRATION_GROWTH = 4.
+ASPIRATION_TRIES = 3
+
+INFINITY = float("inf")
+
+# Default node budget of the exact endgame solver (see `endgame.MAX_NODES`)
+ENDGAME_NODES = 20000
+
+# Longest search, in milliseconds, between two reads of the move timer
+CHECK_PERIOD = 1.
+
+# Most nodes searched between two reads of the move timer while the timer
+# does not move from one read to the next (e.g., a coarse timer)
+CHECK_NODES = 100
+
+# Name of the center region of the heuristics, registered with boards that
+# count the blank squares of regions (see `count_center_blanks`)
+CENTER_REGION = "center"
+
+CENTER_WEIGHT = 2.0
+CORNER_WEIGHT = 0.5
+EDGE_WEIGHT = 1.0
+
 
 class SearchTimeout(Exception):
     """Subclass base exception for code clarity. """
@@ -41,17 +78,13 @@ def custom_score(game, player):
         return float("-inf")
 
     opponent = game.get_opponent(player)
-    opponent_moves = game.get_legal_moves(opponent)
-    my_moves = game.get_legal_moves(player)
-    my_weighted_score = calculate_weigthed_score(my_moves, game.height, game.width)
-    opponent_weighted_score = calculate_weigthed_score(opponent_moves, game.height, game.width)
 
-    open_moves = len(game.get_blank_spaces())
-    total_space = game.height*game.width
     if center_space_ratio(game) > 0.6:
+        my_weighted_score = calculate_weigthed_score(legal_moves(game, player), game.height, game.width)
+        opponent_weighted_score = calculate_weigthed_score(legal_moves(game, opponent), game.height, game.width)
         return my_weighted_score - opponent_weighted_score
     else:
-        return float(len(my_moves) - len(opponent_moves))
+        return float(count_legal_moves(game, player) - count_legal_moves(game, opponent))
 
 
 def custom_score_2(game, player):
@@ -81,12 +114,9 @@ def custom_score_2(game, player):
     elif game.is_loser(player):
         return float("-inf")
 
-    moves = game.get_legal_moves(player)
-    opponent_moves = game.get_legal_moves(game.get_opponent(player))
-
     if center_space_ratio(game) > 0.6:
         return distance_between_player(game)
-    return float(len(moves) - len(opponent_moves))
+    return float(count_legal_moves(game, player) - count_legal_moves(game, game.get_opponent(player)))
 
 
 def custom_score_3(game, player):
@@ -116,9 +146,53 @@ def custom_score_3(game, player):
         return float("-inf")
 
     free_ratio = free_space_ratio(game)
-    opponent_moves = game.get_legal_moves(game.get_opponent(player))
-    my_moves = game.get_legal_moves(player)
-    return free_ratio*(distance_from_center(game, player)) + (1-free_ratio)*(float(len(my_moves) - len(opponent_moves)))
+    opponent_moves = count_legal_moves(game, game.get_opponent(player))
+    my_moves = count_legal_moves(game, player)
+    return free_ratio*(distance_from_center(game, player)) + (1-free_ratio)*(float(my_moves - opponent_moves))
+
+
+def count_legal_moves(game, player):
+    """ Counts the legal moves of a player
+
+    Parameters
+    ----------
+    game: `isolation.Board`
+        An instance of `isolation.Board`
+
+    player : object
+        A player instance in the current game
+
+    Returns
+    -------
+    int
+        Number of legal moves, counted without building or shuffling a list
+        of them on boards that support it
+    """
+    if hasattr(game, "count_legal_moves"):
+        return game.count_legal_moves(player)
+    return len(game.get_legal_moves(player))
+
+
+def legal_moves(game, player):
+    """ Lists the legal moves of a player in no particular order
+
+    Parameters
+    ----------
+    game: `isolation.Board`
+        An instance of `isolation.Board`
+
+    player : object
+        A player instance in the current game
+
+    Returns
+    -------
+    iterable<(int, int)>
+        The legal moves, which boards that support it produce without
+        building or shuffling a list of them
+    """
+    if hasattr(game, "iter_legal_moves"):
+        return game.iter_legal_moves(player)
+    return game.get_legal_moves(player)
 
 
 def free_space_ratio(game):
@@ -134,7 +208,7 @@ def free_space_ratio(game):
     float
         Ratio of available spaces
     """
-    free_space_count = len(game.get_blank_spaces())
+    free_space_count = count_blank_spaces(game)
     total_space = game.height * game.width
     return free_space_count/total_space
 
@@ -152,10 +226,55 @@ def center_space_ratio(game):
     float
         Ratio of available center spaces
     """
-    def center_filter(move, h, w):
-        return 0 + 2 < move[0] < w - 2 and 0 + 2 < move[1] < h - 2
-    center_spaces = list(filter(lambda mov: center_filter(mov,game.height, game.width), game.get_blank_spaces()))
-    return float(len(center_spaces)/(game.width*game.height))
+    center_spaces = count_center_blanks(game)
+    return float(center_spaces/(game.width*game.height))
+
+
+def count_blank_spaces(game):
+    """ Counts the blank spaces of the board
+
+    Parameters
+    ----------
+    game: `isolation.Board`
+        An instance of `isolation.Board`
+
+    Returns
+    -------
+    int
+        Number of blank spaces, read from the incremental counter of boards
+        that keep one and counted from get_blank_spaces() otherwise
+    """
+    if hasattr(game, "count_blank_spaces"):
+        return game.count_blank_spaces()
+    return len(game.get_blank_spaces())
+
+
+def count_center_blanks(game):
+    """ Counts the blank spaces in the center region of the board
+
+    Boards that count the blank squares of registered regions (see
+    `isolation.Board.register_region`) keep this count up to date as moves
+    are applied; the center region is registered the first time it is
+    needed. Other boards are counted from get_blank_spaces().
+
+    Parameters
+    ----------
+    game: `isolation.Board`
+        An instance of `isolation.Board`
+
+    Returns
+    -------
+    int
+        Number of blank spaces in the center region
+    """
+    if not hasattr(game, "count_region_blanks"):
+        in_center = score_tables(game.width, game.height).in_center
+        return sum(1 for row, col in game.get_blank_spaces() if in_center[row + col * game.height])
+    try:
+        return game.count_region_blanks(CENTER_REGION)
+    except KeyError:
+        type(game).register_region(CENTER_REGION, center_cells)
+        return game.count_region_blanks(CENTER_REGION)
 
 
 def distance_between_player(game):
@@ -194,9 +313,8 @@ def distance_from_center(game, player):
     float
         distance between player and center of board
     """
-    w, h = game.width / 2., game.height / 2.
     y, x = game.get_player_location(player)
-    return float((h - y)**2 + (w - x)**2)
+    return score_tables(game.width, game.height).center_distance[y + x * game.height]
 
 
 def calculate_weigthed_score(list_moves, height, width):
@@ -214,8 +332,8 @@ def calculate_weigthed_score(list_moves, height, width):
         Weighted sum of moves
     """
 
-    scores = map(lambda move: assign_weight(move, height, width), list_moves)
-    return sum(scores)
+    weight = score_tables(width, height).weight
+    return sum(weight[row + col * height] for row, col in list_moves)
 
 
 def assign_weight(move, h, w):
@@ -236,15 +354,76 @@ def assign_weight(move, h, w):
         Weighted value of a move
     """
 
-    x_cor = [0,w-1]
-    y_cor = [0,h-1]
+    return score_tables(w, h).weight[move[0] + move[1] * h]
+
+
+class ScoreTables(object):
+    """Heuristic lookup tables for one board size, indexed by square index
+    like `isolation.Board`: the cell at (row, column) has index
+    ``row + column * height``.
+
+    Attributes
+    ----------
+    in_center : list<bool>
+        Whether each square lies in the center region used by
+        `center_space_ratio` and `assign_weight`.
+
+    is_corner : list<bool>
+        Whether each square is one of the corner pieces of `assign_weight`.
 
-    corner_pieces = [(x,y) for x in x_cor for y in y_cor]
-    if 0 + 2 < move[0] < w - 2 and 0 + 2 < move[1] < h - 2:
-        return 2.0
-    elif move in corner_pieces:
-        return 0.5
-    return 1.0
+    weight : list<float>
+        The move weight of `assign_weight` for each square.
+
+    center_distance : list<float>
+        The squared distance of each square from the center of the board,
+        as computed by `distance_from_center`.
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.in_center = []
+        self.is_corner = []
+        self.weight = []
+        self.center_distance = []
+
+        # NOTE: the row is compared against the width and the column against
+        # the height, exactly like the original heuristics did
+        corner_pieces = [(x, y) for x in [0, width - 1] for y in [0, height - 1]]
+        cw, ch = width / 2., height / 2.
+        for idx in range(width * height):
+            row, col = idx % height, idx // height
+            in_center = 2 < row < width - 2 and 2 < col < height - 2
+            is_corner = (row, col) in corner_pieces
+            self.in_center.append(in_center)
+            self.is_corner.append(is_corner)
+            if in_center:
+                self.weight.append(CENTER_WEIGHT)
+            elif is_corner:
+                self.weight.append(CORNER_WEIGHT)
+            else:
+                self.weight.append(EDGE_WEIGHT)
+            self.center_distance.append(float((ch - row)**2 + (cw - col)**2))
+
+
+_SCORE_TABLES = {}
+
+
+def score_tables(width, height):
+    """Return the `ScoreTables` for the given board size, building them the
+    first time that size is requested.
+    """
+    tables = _SCORE_TABLES.get((width, height))
+    if tables is None:
+        tables = _SCORE_TABLES[(width, height)] = ScoreTables(width, height)
+    return tables
+
+
+def center_cells(width, height):
+    """Return the (row, column) pairs of the center region for a board size.
+    """
+    tables = score_tables(width, height)
+    return [(idx % height, idx // height)
+            for idx in range(width * height) if tables.in_center[idx]]
 
 
 class IsolationPlayer:
@@ -268,12 +447,107 @@ class IsolationPlayer:
         Time remaining (in milliseconds) when search is aborted. Should be a
         positive value large enough to allow the function to return before the
         timer expires.
+
+    node_limit : int (optional)
+        If set, the search for each move is aborted (like a timeout) after
+        visiting this many nodes. Combined with `Board.play(time_limit=None)`
+        this makes every move independent of wall-clock time, so games run
+        at full speed and reproduce from run to run.
+
+    depth_limit : int (optional)
+        If set, iterative deepening stops after completing this depth.
+
+    stats : bool (optional)
+        If True, record the statistics of every move in `self.stats` (see
+        `search_stats.SearchStats`); otherwise `self.stats` is None.
     """
-    def __init__(self, search_depth=3, score_fn=custom_score_2, timeout=10.):
+    def __init__(self, search_depth=3, score_fn=custom_score_2, timeout=10.,
+                 node_limit=None, depth_limit=None, stats=False):
         self.search_depth = search_depth
         self.score = score_fn
         self.time_left = None
         self.TIMER_THRESHOLD = timeout
+        self.node_limit = node_limit
+        self.depth_limit = depth_limit
+        self.stats = None
+        if stats:
+            from search_stats import SearchStats
+            self.stats = SearchStats()
+        self.nodes = 0
+        self._in_place = False
+        self._stop_at = timeout
+        self._next_check = 0
+        self._check_nodes = 0
+        self._check_time = 0.
+
+    def start_search(self, time_left):
+        """Reset the node count and the timer checks of check_budget() for a
+        new search limited by the `time_left` callable (None for no timer).
+        """
+        self.time_left = time_left
+        self.nodes = 0
+        self._stop_at = self.TIMER_THRESHOLD
+        self._next_check = 0
+        self._check_nodes = 0
+        self._check_time = time_left() if time_left is not None else 0.
+
+    def budget_spent(self):
+        """Return which budget stopped the last search: "nodes" if its node
+        budget is spent, "time manager" if it stopped before the timer
+        threshold (see `stop_at`), or "timeout" otherwise.
+        """
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            return "nodes"
+        if self._stop_at > self.TIMER_THRESHOLD:
+            return "time manager"
+        return "timeout"
+
+    def stop_at(self, remaining):
+        """Make the search of the current move stop when `remaining`
+        milliseconds are left on its timer instead of TIMER_THRESHOLD, if
+        that is earlier.
+        """
+        self._stop_at = max(self.TIMER_THRESHOLD, remaining)
+
+    def check_budget(self):
+        """Count a search node and raise SearchTimeout if the node budget of
+        the current move is spent or the timer is about to expire (or reaches
+        the time set by stop_at()). A player without a `time_left` callable is
+        only limited by its node budget.
+
+        Reading the timer costs about as much as a search node, so it is only
+        read every few nodes: often enough that, at the node rate measured
+        since the previous read, no more than CHECK_PERIOD milliseconds or
+        half of the time left before the search must stop pass between two reads.
+        The interval at most doubles from one read to the next, so a burst
+        of fast nodes cannot stretch it far. The node rate is measured with
+        the `time_left` timer itself; while the timer does not move, no more
+        than CHECK_NODES nodes pass between two reads.
+        """
+        self.nodes += 1
+        if self.nodes < self._next_check:
+            return
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchTimeout()
+
+        if self.time_left is None:
+            interval = float("inf")
+        else:
+            remaining = self.time_left()
+            if remaining < self._stop_at:
+                raise SearchTimeout()
+            elapsed = self._check_time - remaining
+            interval = self.nodes - self._check_nodes
+            if elapsed > 0:
+                period = min(CHECK_PERIOD, (remaining - self._stop_at) / 2.)
+                interval = min(2 * interval, int(interval * period / elapsed))
+            else:
+                interval = min(2 * interval, CHECK_NODES)
+            self._check_nodes = self.nodes
+            self._check_time = remaining
+        self._next_check = self.nodes + max(1, interval)
+        if self.node_limit is not None:
+            self._next_check = min(self._next_check, self.node_limit + 1)
 
 
 class MinimaxPlayer(IsolationPlayer):
@@ -310,7 +584,9 @@ class MinimaxPlayer(IsolationPlayer):
             Board coordinates corresponding to a legal move; may return
             (-1, -1) if there are no available legal moves.
         """
-        self.time_left = time_left
+        self.start_search(time_left)
+        if self.stats is not None:
+            self.stats.start_move()
 
         # Initialize the best move so that this function returns something
         # in case the search fails due to timeout
@@ -319,11 +595,16 @@ class MinimaxPlayer(IsolationPlayer):
         try:
             # The try/except block will automatically catch the exception
             # raised when the timer is about to expire.
-            return self.minimax(game, self.search_depth)
+            best_move = self.minimax(game, self.search_depth)
+            if self.stats is not None:
+                self.stats.end_move(self.nodes, self.search_depth, "depth")
+            return best_move
 
         except SearchTimeout:
             pass  # Handle any actions required after timeout as needed
 
+        if self.stats is not None:
+            self.stats.end_move(self.nodes, None, self.budget_spent())
         # Return the best move from the last completed search iteration
         return best_move
 
@@ -366,17 +647,26 @@ class MinimaxPlayer(IsolationPlayer):
                 each helper function or else your agent will timeout during
                 testing.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
-        moves = game.get_legal_moves()
-        if len(moves) == 0:
-            return -1, -1
-
-        result = max([(self.minvalue(game.forecast_move(move), game.active_player, depth-1), move)for move in moves],key=lambda x: x[0])
-        return result[1]
+        self.check_budget()
+
+        # Boards that support push_move()/pop_move() are searched in place on
+        # a private copy; others, like the project's Board, on the copies made
+        # by forecast_move()
+        self._in_place = hasattr(game, "push_move")
+        if self._in_place:
+            game = game.copy()
+        player = game.active_player
+        best_score, best_move = -INFINITY, (-1, -1)
+        for move in game.iter_legal_moves() if self._in_place else game.get_legal_moves():
+            score = -self.search_child(game, move, player, depth-1)
+            if best_move == (-1, -1) or score > best_score:
+                best_score, best_move = score, move
+        return best_move
 
-    def minvalue(self, game, activeplayer, depth):
-        """ Implements the min value function of the minimax algorithm
+    def negamax(self, game, player, depth):
+        """ Implements the minimax value function in negamax form: the value
+        of a position for the player to move is the largest negated value of
+        its successors for the other player
 
         Parameters
         ----------
@@ -384,8 +674,9 @@ class MinimaxPlayer(IsolationPlayer):
             An instance of the Isolation game `Board` class representing the
             current game state
 
-        activeplayer: object
-            Tracks the existing player for the intial move
+        player: object
+            The player to move at the root, whose `self.score()` is used to
+            evaluate the positions at the search horizon
 
         depth : int
             Depth is an integer representing the maximum number of plies to
@@ -393,58 +684,199 @@ class MinimaxPlayer(IsolationPlayer):
 
         Returns
         -------
-        int
-            returns the move that results in smallest score
-
+        float
+            The value of the position for the player to move
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
-
-        if game.utility(activeplayer) != 0:
-            return game.utility(activeplayer)
-        elif depth == 0:
-            return self.score(game, activeplayer)
-
-        moves = game.get_legal_moves()
-        return min([self.maxvalue(game.forecast_move(move), activeplayer, depth-1) for move in moves])
-
-    def maxvalue(self, game, activeplayer, depth):
-        """ Implements the max value function for the minimax algorithm
-
-        Parameters
-        ----------
-        game : isolation.Board
-            An instance of the Isolation game `Board` class representing the
-            current game state
-
-        activeplayer: object
-            Tracks the existing player for the intial move
-
-        depth : int
-            Depth is an integer representing the maximum number of plies to
-            search in the game tree before aborting
-
-        Returns
-        -------
-         int
-            returns the move that results in the largest value
+        self.check_budget()
+
+        active = game.active_player
+        if game.is_loser(active):
+            return -INFINITY
+        if depth == 0:
+            if self.stats is not None:
+                self.stats.evaluations += 1
+            score = self.score(game, player)
+            return score if active is player else -score
+
+        v = -INFINITY
+        for move in game.iter_legal_moves() if self._in_place else game.get_legal_moves():
+            value = -self.search_child(game, move, player, depth-1)
+            if value > v:
+                v = value
+        return v
+
+    def search_child(self, game, move, player, depth):
+        """ Returns the negamax value of the position after `move`, applied in
+        place and taken back when the board supports push_move()/pop_move(),
+        or applied to a copy from forecast_move() otherwise
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
-
-        if game.utility(activeplayer) != 0:
-            return game.utility(activeplayer)
-        elif depth == 0:
-            return self.score(game, activeplayer)
-
-        return max([self.minvalue(game.forecast_move(move), activeplayer, depth-1) for move in game.get_legal_moves()])
+        if not self._in_place:
+            return self.negamax(game.forecast_move(move), player, depth)
+        game.push_move(move)
+        value = self.negamax(game, player, depth)
+        game.pop_move()
+        return value
 
 
 class AlphaBetaPlayer(IsolationPlayer):
     """Game-playing agent that chooses a move using iterative deepening minimax
     search with alpha-beta pruning. You must finish and test this player to
     make sure it returns a good move before the search time limit expires.
+
+    The transposition table, move ordering, endgame solver, pondering and
+    time management rely on the incremental state of the bitboard
+    `isolation.Board` (Zobrist keys, initiative, knight move bitboards). They
+    are set up by the first search of a board that supports push_move(),
+    which is searched in place; boards without it, like the project's Board,
+    are searched on the copies made by forecast_move() without them.
+
+    Parameters
+    ----------
+    search_depth : int (optional)
+        See `IsolationPlayer`.
+
+    score_fn : callable (optional)
+        See `IsolationPlayer`.
+
+    timeout : float (optional)
+        See `IsolationPlayer`.
+
+    node_limit, depth_limit : int (optional)
+        See `IsolationPlayer`.
+
+    tt_entries : int (optional)
+        The number of entries in the transposition table, which is kept
+        between moves. A value of 0 or None disables the table.
+
+    tt_policy : str (optional)
+        The replacement policy of the transposition table ("two-tier",
+        "depth" or "always"); see `transposition.TranspositionTable`.
+
+    move_ordering : bool (optional)
+        Search the principal variation move first, then killer moves, then
+        the remaining moves by history score (see `move_ordering`). When
+        False, moves are searched in the order returned by the board.
+
+    endgame_nodes : int (optional)
+        The node budget of the exact endgame solver (see `endgame`), which
+        replaces the search once the players are partitioned. Positions
+        inside the search tree get a tenth of the budget. A value of 0 or
+        None disables the solver.
+
+    ponder : bool (optional)
+        Keep searching in a background thread while the opponent chooses its
+        move: the position after the opponent's predicted reply (the hash
+        move of the transposition table) is searched for up to
+        `ponder_time` milliseconds, and if that reply is played the next
+        search finds the results in the transposition table. Requires a
+        transposition table.
+
+        NOTE: the thread shares the interpreter lock with everything else in
+        the process. Pondering only adds search time when the opponent runs
+        in another process; against an opponent in the same process (e.g.,
+        in `tournament.py`) it takes its time from the opponent's search.
+
+    ponder_time : float (optional)
+        The maximum number of milliseconds spent pondering after each move.
+
+    pvs : bool (optional)
+        Use principal variation search: after the first move at a node, each
+        move is searched with a null window that only proves it is not
+        better, and searched again with the full window when it is.
+
+    aspiration : float (optional)
+        If set, each iteration of iterative deepening starts with a window of
+        this half-width around the score of the previous iteration, widened
+        by a factor of ASPIRATION_GROWTH on the failing side (and opened
+        completely after ASPIRATION_TRIES failures) until the score falls
+        inside it. None searches every iteration with a full window.
+
+    time_management : bool (optional)
+        Stop iterative deepening early when the next iteration is predicted
+        not to finish before the timer expires (see
+        `time_management.TimeManager`).
+
+    phase_scaling : bool (optional)
+        With time management, budget less of the available time for moves in
+        the opening and in quiet positions than in critical positions with
+        few legal moves. Once the first iteration is complete, the search
+        stops when the budget is spent.
+
+    Attributes
+    ----------
+    ponder_hits, ponder_misses : int
+        The number of moves for which the opponent did or did not play the
+        `predicted_reply` that was searched while pondering.
+
+    pvs_researches, aspiration_researches : int
+        The number of full-window re-searches after a null window failed
+        high, and of root re-searches after an aspiration window failed,
+        during the last call to get_move().
+
+    completed_depth, stop_reason : int, str
+        The deepest iteration completed by the last call to
+        iterative_deepening(), and why it stopped (see
+        `search_stats.MoveStats`).
+
+    root_score : float
+        The score, for the player to move, of the root position searched by
+        the last call to alphabeta().
     """
+    def __init__(self, search_depth=3, score_fn=custom_score_2, timeout=10.,
+                 node_limit=None, depth_limit=None,
+                 tt_entries=2**16, tt_policy="two-tier", move_ordering=True,
+                 endgame_nodes=ENDGAME_NODES, ponder=False, ponder_time=150.,
+                 pvs=True, aspiration=1., time_management=True, phase_scaling=False,
+                 stats=False):
+        super().__init__(search_depth, score_fn, timeout, node_limit, depth_limit, stats)
+        self.tt_entries = tt_entries
+        self.tt_policy = tt_policy
+        self.move_ordering = move_ordering
+        self.time_management = time_management
+        self.phase_scaling = phase_scaling
+        self.tt = None
+        self.orderer = None
+        self.time_manager = None
+        self.endgame_nodes = endgame_nodes
+        self.ponder = ponder and bool(tt_entries)
+        self.ponder_time = ponder_time
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+        self.predicted_reply = None
+        self.pvs = pvs
+        self.aspiration = aspiration
+        self.pvs_researches = 0
+        self.aspiration_researches = 0
+        self.root_score = None
+        self.completed_depth = None
+        self.stop_reason = None
+        self._tt_salt = 0
+        self._root_depth = 0
+        self._pv_move = None
+        self._root_move = None
+        self._ponder_thread = None
+        self._ponder_stop = None
+        self._ponder_key = None
+        self._extensions_loaded = False
+
+    def use_board(self, game):
+        """Prepare to search boards like the input one: in place, with the
+        transposition table, move orderer and time manager enabled by the
+        options (created on first use), if the board supports push_move(),
+        and on copies made by forecast_move() without them otherwise.
+        """
+        self._in_place = hasattr(game, "push_move")
+        if self._in_place and not self._extensions_loaded:
+            self._extensions_loaded = True
+            if self.tt_entries:
+                from transposition import TranspositionTable
+                self.tt = TranspositionTable(self.tt_entries, self.tt_policy)
+            if self.move_ordering:
+                from move_ordering import MoveOrderer
+                self.orderer = MoveOrderer()
+            if self.time_management:
+                from time_management import TimeManager
+                self.time_manager = TimeManager(self.phase_scaling)
 
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
@@ -476,26 +908,162 @@ class AlphaBetaPlayer(IsolationPlayer):
             Board coordinates corresponding to a legal move; may return
             (-1, -1) if there are no available legal moves.
         """
-        self.time_left = time_left
+        self.stop_pondering(game)
+        self.use_board(game)
+        self.start_search(time_left)
+        self.pvs_researches = 0
+        self.aspiration_researches = 0
+        if self.tt is not None:
+            self.tt.new_search()
+        if self.orderer is not None:
+            self.orderer.new_search()
+        self._pv_move = None
+        if self.stats is not None:
+            self.stats.start_move(self.tt)
+
+        # Once the players are partitioned the game is decided by the longest
+        # paths in their regions, so an exact solution replaces the search.
+        # The solver may use half of the time, leaving the rest for a search
+        if self.endgame_nodes and self._in_place:
+            reserve = time_left() / 2.
+            solved = self.solve_endgame(game, self.endgame_nodes,
+                                        stop=lambda: self.time_left() < reserve)
+            if solved is not None:
+                if self.stats is not None:
+                    self.stats.end_move(self.nodes, None, "endgame", self.tt)
+                return solved[1]
+
+        best_move = self.iterative_deepening(game)
+        if self.stats is not None:
+            self.stats.end_move(self.nodes, self.completed_depth, self.stop_reason, self.tt)
+        if self.ponder and self._in_place and best_move != (-1, -1):
+            self.start_pondering(game, best_move)
+        return best_move
 
+    def iterative_deepening(self, game):
+        """Search the input position with alpha-beta search to increasing
+        depths until the budget or the timer runs out, and return the best
+        move of the last completed iteration.
+        """
         # Initialize the best move so that this function returns something
         # in case the search fails due to timeout
         best_move = (-1, -1)
+        self.root_score = None
+        self.completed_depth = None
+        self.stop_reason = "depth"
 
         try:
             # The try/except block will automatically catch the exception
             # raised when the timer is about to expire.
+            # A game cannot last more plies than there are blank squares, so
+            # deeper iterations cannot change the result
             depth = 0
-            while True:
-                best_move = self.alphabeta(game, depth)
+            max_depth = count_blank_spaces(game)
+            if self.depth_limit is not None:
+                max_depth = min(max_depth, self.depth_limit)
+            if self.time_manager is not None:
+                self.time_manager.new_search(game, self.time_left, self.TIMER_THRESHOLD)
+            while depth <= max_depth:
+                best_move = self.aspiration_search(game, depth)
+                self._pv_move = best_move
+                self.completed_depth = depth
+                # Once a move is known, the budget of the time manager is
+                # enforced within iterations as well
+                if self.time_manager is not None and depth == 1:
+                    self.stop_at(self.time_manager.stop_at)
+                if self.time_manager is not None and depth < max_depth:
+                    self.time_manager.iteration_done(self.nodes)
+                    if not self.time_manager.next_iteration_fits():
+                        self.stop_reason = "time manager"
+                        break
                 depth += 1
 
         except SearchTimeout:
-            pass  # Handle any actions required after timeout as needed
+            # Handle any actions required after timeout as needed
+            self.stop_reason = self.budget_spent()
 
         # Return the best move from the last completed search iteration
         return best_move
 
+    def aspiration_search(self, game, depth):
+        """Search the root to the given depth, starting with an aspiration
+        window around the previous iteration's score (see `aspiration`), and
+        return the best move.
+        """
+        score = self.root_score
+        if not self.aspiration or score is None or math.isinf(score):
+            return self.alphabeta(game, depth)
+
+        low = high = self.aspiration
+        for _ in range(ASPIRATION_TRIES):
+            alpha, beta = score - low, score + high
+            move = self.alphabeta(game, depth, alpha, beta)
+            if alpha < self.root_score < beta:
+                return move
+            self.aspiration_researches += 1
+            if self.root_score <= alpha:
+                low *= ASPIRATION_GROWTH
+            else:
+                high *= ASPIRATION_GROWTH
+        return self.alphabeta(game, depth)
+
+    def start_pondering(self, game, move):
+        """Start searching, in a background thread, the position expected
+        after this player's `move` and the reply to it predicted by the
+        transposition table. Nothing happens if there is no prediction, or
+        if the game ends with `move` or with the predicted reply.
+        """
+        self.predicted_reply = None
+        game = game.copy()
+        game.apply_move(move)
+        entry = self.tt.probe(game.zobrist_key ^ self._tt_salt)
+        # An opponent without legal moves has lost, so no reply is legal
+        if entry is None or entry[4] not in game.get_legal_moves():
+            return
+        self.predicted_reply = entry[4]
+        game.apply_move(entry[4])
+        if game.is_loser(self):
+            return
+        import threading
+        self._ponder_key = game.zobrist_key
+        self._ponder_stop = threading.Event()
+        self._ponder_thread = threading.Thread(target=self._ponder, args=(game, self._ponder_stop),
+                                               name="ponder", daemon=True)
+        self._ponder_thread.start()
+
+    def _ponder(self, game, stop):
+        # Let get_move() return its move before this thread competes with it
+        # for the interpreter lock, which could otherwise delay the return
+        # by a whole thread switch interval
+        if stop.wait(PONDER_DELAY):
+            return
+        import time
+        deadline = time.time() + self.ponder_time / 1000.
+        self.start_search(lambda: (float("-inf") if stop.is_set() or time.time() > deadline
+                                   else float("inf")))
+        self.tt.new_search()
+        if self.orderer is not None:
+            self.orderer.new_search()
+        self._pv_move = None
+        self.iterative_deepening(game)
+
+    def stop_pondering(self, game=None):
+        """Stop the background search started by `start_pondering`, if any,
+        and count a ponder hit if it searched the input position or a miss
+        otherwise.
+        """
+        if self._ponder_thread is None:
+            return
+        self._ponder_stop.set()
+        self._ponder_thread.join()
+        if game is not None:
+            if game.zobrist_key == self._ponder_key:
+                self.ponder_hits += 1
+            else:
+                self.ponder_misses += 1
+        self._ponder_thread = None
+        self._ponder_stop = None
+
     def alphabeta(self, game, depth, alpha=float("-inf"), beta=float("inf")):
         """Implement depth-limited minimax search with alpha-beta pruning as
         described in the lectures.
@@ -541,14 +1109,64 @@ class AlphaBetaPlayer(IsolationPlayer):
                 each helper function or else your agent will timeout during
                 testing.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
-
-        result = self.maxvalue(game, depth)
-        return result[1]
+        self.check_budget()
+
+        # Boards that support push_move()/pop_move() are searched in place on
+        # a private copy; others on the copies made by forecast_move()
+        self.use_board(game)
+        self._root_depth = depth
+        if self._in_place:
+            self._tt_salt = PERSPECTIVE_KEY if game.initiative else 0
+            game = game.copy()
+            moves = list(game.iter_legal_moves())
+        else:
+            moves = game.get_legal_moves()
+        if depth == 0 or not moves:
+            self.root_score = self.negamax(game, 0, alpha, beta)
+            return -1, -1
+        if self.orderer is not None:
+            moves = self.orderer.order(moves, 0, game.initiative, self._pv_move)
+        self.root_score = self.negamax(game, depth, alpha, beta, moves)
+        return self._root_move
+
+    def search_moves(self, game, depth, moves):
+        """Search a subset of the root moves to the given depth and return
+        the best (score, move) pair among them; the score of the best move is
+        exact. This lets several processes split the root moves between them
+        (see `parallel_search`).
+        """
+        self.check_budget()
+
+        self.use_board(game)
+        if self._in_place:
+            self._tt_salt = PERSPECTIVE_KEY if game.initiative else 0
+        self._root_depth = depth
+        score = self.negamax(game.copy(), depth, -INFINITY, INFINITY, moves)
+        return score, self._root_move
+
+    def out_of_time(self):
+        """Return True when the search timer is about to expire, or reaches
+        the time set by stop_at().
+        """
+        return self.time_left is not None and self.time_left() < self._stop_at
 
-    def minvalue(self, game, depth, alpha=float("-inf"), beta=float("inf")):
-        """ Implements the min value function of the minimax algorithm with cutoff
+    def solve_endgame(self, game, max_nodes, longest=True, stop=None):
+        """Return the exact score of a partitioned position for this player
+        (+inf or -inf) and a move for the active player that achieves it, or
+        None if the players are not partitioned or the solver gives up (see
+        `endgame.solve`).
+        """
+        import endgame
+        solved = endgame.solve(game, max_nodes, longest, stop)
+        if solved is None:
+            return None
+        active_wins, move = solved
+        if active_wins == (game.active_player == self):
+            return float("inf"), move
+        return float("-inf"), move
+
+    def ordered_moves(self, game, depth, hash_move):
+        """ Return the legal moves of the current node in search order
 
         Parameters
         ----------
@@ -557,44 +1175,32 @@ class AlphaBetaPlayer(IsolationPlayer):
             current game state
 
         depth : int
-            Depth is an integer representing the maximum number of plies to
-            search in the game tree before aborting
-
-        alpha : float
-            Alpha limits the lower bound of search on minimizing layers
+            The remaining search depth of the current node
 
-        beta : float
-            Beta limits the upper bound of search on maximizing layers
+        hash_move : (int, int) or None
+            The best move stored in the transposition table for the node
 
         Returns
         -------
-        (int, (int, int))
-            A tuple consisting of score, board coordinates of the best move found in the current search;
-            (-1, -1) if there are no legal moves
-
+        iterator<(int, int)>
+            The legal moves, hash move first when ordering is enabled
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
-
-        if game.utility(self) != 0:
-            return game.utility(self), (-1, -1)
-        elif depth == 0:
-            return self.score(game, self), (-1, -1)
+        if self.orderer is None:
+            return game.iter_legal_moves() if self._in_place else game.get_legal_moves()
+        return self.orderer.order_moves(game.iter_legal_moves(), self._root_depth - depth,
+                                        game.initiative, hash_move)
+
+    def store_tt(self, game, depth, score, alpha, beta, move):
+        """ Record the result of a node in the transposition table, using the
+        node's original (alpha, beta) window to classify the bound
+        """
+        self.tt.record(game.zobrist_key ^ self._tt_salt, depth, score, alpha, beta, move)
 
-        v = float("+inf")
-        best_move = (-1, -1)
-        list_of_moves = []
-        for move in game.get_legal_moves():
-            list_of_moves.append(move)
-            v_branch, tmp_move = self.maxvalue(game.forecast_move(move), depth-1, alpha, beta)
-            v, best_move = min((v, best_move), (v_branch, move), key=lambda x: x[0])
-            if v <= alpha:
-                return v, best_move
-            beta = min(v, beta)
-        return v, best_move
-
-    def maxvalue(self, game, depth, alpha=float("-inf"), beta=float("inf")):
-        """ Implements the max value function for the minimax algorithm with cutoff
+    def negamax(self, game, depth, alpha=float("-inf"), beta=float("inf"), moves=None):
+        """ Implements the alpha-beta value function in negamax form: the
+        value of a position for the player to move is the largest negated
+        value of its successors, each searched with the negated and swapped
+        (alpha, beta) window
 
         Parameters
         ----------
@@ -607,34 +1213,90 @@ class AlphaBetaPlayer(IsolationPlayer):
             search in the game tree before aborting
 
         alpha : float
-            Alpha limits the lower bound of search on minimizing layers
+            The lowest score the player to move is still interested in
 
         beta : float
-            Beta limits the upper bound of search on maximizing layers
+            The score at which the opponent avoids this position
 
+        moves : list<(int, int)> (optional)
+            If given, the node is the root of the search: exactly these moves
+            are searched, in this order, the best one is left in
+            `self._root_move`, and the transposition table is not used for
+            the node itself
 
         Returns
         -------
-        (int, (int, int))
-            A tuple consisting of score, board coordinates of the best move found in the current search;
-            (-1, -1) if there are no legal moves
-        """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
-
-        if game.utility(self) != 0:
-            return game.utility(self), (-1, -1)
-        elif depth == 0:
-            return self.score(game, self), (-1, -1)
-
-        v = float("-inf")
-        best_move = (-1,-1)
-        for move in game.get_legal_moves():
-            v_branch, tmp_move = self.minvalue(game.forecast_move(move), depth-1, alpha, beta)
-            v, best_move = max((v, best_move), (v_branch, move), key=lambda x: x[0])
-            if v >= beta:
-                return v, best_move
-            alpha = max(v, alpha)
-        return v, best_move
-
+        float
+            The score of the position for the player to move; outside the
+            (alpha, beta) window, a bound on the score
 
+        """
+        self.check_budget()
+
+        root = moves is not None
+        if not root:
+            active = game.active_player
+            if game.is_loser(active):
+                return -INFINITY
+            if depth == 0:
+                if self.stats is not None:
+                    self.stats.evaluations += 1
+                score = self.score(game, self)
+                return score if active is self else -score
+            if self.endgame_nodes and self._in_place:
+                solved = self.solve_endgame(game, self.endgame_nodes // 10, longest=False,
+                                            stop=self.out_of_time)
+                if solved is not None:
+                    return solved[0] if active is self else -solved[0]
+
+            # Scores are stored for the player to move, which the key
+            # determines through the number of blocked squares
+            hash_move = None
+            if self.tt is not None:
+                hash_move, score = self.tt.lookup(game.zobrist_key ^ self._tt_salt,
+                                                  depth, alpha, beta)
+                if score is not None:
+                    return score
+            moves = self.ordered_moves(game, depth, hash_move)
+        alpha_orig = alpha
+
+        v = -INFINITY
+        best_move = None
+        in_place = self._in_place
+        for move in moves:
+            if in_place:
+                game.push_move(move)
+                child = game
+            else:
+                child = game.forecast_move(move)
+            if self.pvs and best_move is not None and alpha > -INFINITY:
+                # Principal variation search: prove with a null window that
+                # the move is no better than the best so far, and search it
+                # again with the full window only if that fails
+                value = -self.negamax(child, depth-1, -math.nextafter(alpha, beta), -alpha)
+                if alpha < value < beta:
+                    self.pvs_researches += 1
+                    value = -self.negamax(child, depth-1, -beta, -alpha)
+            else:
+                value = -self.negamax(child, depth-1, -beta, -alpha)
+            if in_place:
+                game.pop_move()
+            # The first move is kept even if every move loses, so that the
+            # search always has a legal move to return
+            if best_move is None or value > v:
+                if value >= beta and self.stats is not None:
+                    self.stats.cutoffs += 1
+                    self.stats.first_cutoffs += best_move is None
+                v, best_move = value, move
+                if v >= beta:
+                    if self.orderer is not None:
+                        self.orderer.record_cutoff(move, self._root_depth - depth,
+                                                   game.initiative, depth)
+                    break
+                if v > alpha:
+                    alpha = v
+        if root:
+            self._root_move = best_move
+        elif self.tt is not None:
+            self.store_tt(game, depth, v, alpha_orig, beta, best_move)
+        return v
@@ -9,10 +9,140 @@ be available to project reviewers.
 """
 import random
 import timeit
-from copy import copy
 
 TIME_LIMIT_MILLIS = 150
 
+# Relative (row, column) offsets for the L-shaped moves of a chess knight
+KNIGHT_DIRECTIONS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                     (1, -2), (1, 2), (2, -1), (2, 1)]
+
+# Named board regions added with Board.register_region(), as a list of
+# (name, cells) pairs in registration order
+_REGIONS = []
+
+
+def popcount(bits):
+    """Return the number of squares set in a bitboard. """
+    return bin(bits).count("1")
+
+
+class RegionTable(object):
+    """Membership tables for the named regions registered for one board size.
+
+    Attributes
+    ----------
+    slots : dict
+        Maps each region name to its slot, i.e., its position in `masks`
+        and in the per-board region counters.
+
+    masks : list<int>
+        A bitboard of the squares of each region.
+
+    square_slots : list<tuple<int>>
+        For each square index, the slots of the regions containing it.
+    """
+    def __init__(self, width, height, regions):
+        self.slots = {}
+        self.masks = []
+        self.square_slots = [()] * (width * height)
+        for slot, (name, cells) in enumerate(regions):
+            mask = 0
+            for row, col in cells(width, height):
+                mask |= 1 << (row + col * height)
+            self.slots[name] = slot
+            self.masks.append(mask)
+            for idx in range(width * height):
+                if mask >> idx & 1:
+                    self.square_slots[idx] += (slot,)
+
+
+class BoardTables(object):
+    """Lookup tables shared by every board of one (width, height) size.
+
+    Squares are numbered the same way as the cells of the original list
+    based board state, i.e., the cell at (row, column) has index
+    ``row + column * height`` and bit ``1 << index`` in a bitboard.
+
+    Attributes
+    ----------
+    coords : list<(int, int)>
+        The (row, column) coordinate pair of each square index.
+
+    knight_masks : list<int>
+        For each square index, a bitboard of the squares reachable with a
+        single knight move from that square.
+
+    full_mask : int
+        A bitboard with every square of the board set.
+
+    zobrist_blocked, zobrist_p1, zobrist_p2 : list<int>
+        Random 64-bit keys for each square being blocked, or holding player 1
+        or player 2. The keys are drawn from a generator seeded by the board
+        size, so they are identical across processes and runs.
+
+    zobrist_initiative : int
+        Random 64-bit key included when player 2 holds the initiative.
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.coords = [(idx % height, idx // height)
+                       for idx in range(width * height)]
+        self.full_mask = (1 << (width * height)) - 1
+        self.knight_masks = []
+        for r, c in self.coords:
+            mask = 0
+            for dr, dc in KNIGHT_DIRECTIONS:
+                if 0 <= r + dr < height and 0 <= c + dc < width:
+                    mask |= 1 << (r + dr + (c + dc) * height)
+            self.knight_masks.append(mask)
+        self._decoded = {}
+
+        rng = random.Random("zobrist-{}x{}".format(width, height))
+        num_squares = width * height
+        self.zobrist_blocked = [rng.getrandbits(64) for _ in range(num_squares)]
+        self.zobrist_p1 = [rng.getrandbits(64) for _ in range(num_squares)]
+        self.zobrist_p2 = [rng.getrandbits(64) for _ in range(num_squares)]
+        self.zobrist_initiative = rng.getrandbits(64)
+
+        self.regions = RegionTable(width, height, _REGIONS)
+
+    def decode(self, bits):
+        """Return the tuple of coordinate pairs for the squares set in the
+        input bitboard, in increasing square index order.
+        """
+        coords = self.coords
+        squares = []
+        while bits:
+            low = bits & -bits
+            squares.append(coords[low.bit_length() - 1])
+            bits ^= low
+        return tuple(squares)
+
+    def decode_moves(self, bits):
+        """Return the same tuple as decode() for a subset of one knight mask.
+        Results are memoized, which makes decoding the legal moves of a
+        placed player a single dict lookup; the memo is bounded by 2^8
+        subsets per square, so other bitboards must use decode().
+        """
+        squares = self._decoded.get(bits)
+        if squares is None:
+            squares = self._decoded[bits] = self.decode(bits)
+        return squares
+
+
+_TABLES = {}
+
+
+def board_tables(width, height):
+    """Return the `BoardTables` for the given board size, building them the
+    first time that size is requested.
+    """
+    tables = _TABLES.get((width, height))
+    if tables is None:
+        tables = _TABLES[(width, height)] = BoardTables(width, height)
+    return tables
+
 
 class Board(object):
     """Implement a model for the game Isolation assuming each player moves like
@@ -33,27 +163,166 @@ class Board(object):
 
     height : int (optional)
         The number of rows that the board should have.
+
+    shuffle : bool (optional)
+        If True, get_legal_moves() returns the moves in random order. If
+        False, moves are always returned in increasing square index order,
+        which makes games and searches reproducible.
+
+    seed : hashable (optional)
+        Seed for a random number generator owned by this board (and shared
+        with its copies) that is used to shuffle moves. If None, moves are
+        shuffled with the global generator of the `random` module.
     """
     BLANK = 0
     NOT_MOVED = None
 
-    def __init__(self, player_1, player_2, width=7, height=7):
+    # The whole game state is a handful of ints (the blocked cells are a
+    # single bitboard int), so boards are small and cheap to copy
+    __slots__ = ("width", "height", "shuffle", "move_count", "_rng",
+                 "_player_1", "_player_2", "_active_player", "_inactive_player",
+                 "_tables", "_occupied", "_p1_loc", "_p2_loc", "_initiative",
+                 "_key", "_p1_moves", "_p2_moves", "_undo_stack",
+                 "_regions", "_blanks", "_region_blanks")
+
+    def __init__(self, player_1, player_2, width=7, height=7, shuffle=True, seed=None):
         self.width = width
         self.height = height
+        self.shuffle = shuffle
+        self._rng = None if seed is None else random.Random(seed)
         self.move_count = 0
         self._player_1 = player_1
         self._player_2 = player_2
         self._active_player = player_1
         self._inactive_player = player_2
+        self._tables = board_tables(width, height)
+
+        # The board is stored as a bitboard of blocked squares along with the
+        # square index of each player (or NOT_MOVED), and the initiative (0
+        # for player 1, 1 for player 2)
+        self._occupied = 0
+        self._p1_loc = Board.NOT_MOVED
+        self._p2_loc = Board.NOT_MOVED
+        self._initiative = 0
+        self._key = 0
+
+        # Lazily computed tuples of legal moves for each player, cleared
+        # whenever a move is applied
+        self._p1_moves = None
+        self._p2_moves = None
+
+        # Undo records for moves applied with push_move()
+        self._undo_stack = []
+
+        # Counters of the blank squares on the board and inside each region
+        # registered with register_region(), updated by apply_move()
+        self._regions = self._tables.regions
+        self._blanks = width * height
+        self._region_blanks = [popcount(mask) for mask in self._regions.masks]
+
+    @staticmethod
+    def register_region(name, cells):
+        """Register a named region of the board whose blank squares are
+        counted incrementally by every board created afterwards; see
+        count_region_blanks().
 
-        # The last 3 entries of the board state includes initiative (0 for
-        # player 1, 1 for player 2) player 2 last move, and player 1 last move
-        self._board_state = [Board.BLANK] * (width * height + 3)
-        self._board_state[-1] = Board.NOT_MOVED
-        self._board_state[-2] = Board.NOT_MOVED
+        Parameters
+        ----------
+        name : hashable
+            The name of the region. Registering a name again replaces the
+            region for boards created afterwards.
+
+        cells : callable
+            A function of (width, height) returning an iterable of the
+            coordinate pairs (row, column) in the region for that board size.
+        """
+        for idx, (region_name, _) in enumerate(_REGIONS):
+            if region_name == name:
+                _REGIONS[idx] = (name, cells)
+                break
+        else:
+            _REGIONS.append((name, cells))
+        for tables in _TABLES.values():
+            tables.regions = RegionTable(tables.width, tables.height, _REGIONS)
+
+    @staticmethod
+    def unregister_region(name):
+        """Stop counting the blank squares of a region registered with
+        register_region() on boards created afterwards. Unknown names are
+        ignored.
+        """
+        _REGIONS[:] = [region for region in _REGIONS if region[0] != name]
+        for tables in _TABLES.values():
+            tables.regions = RegionTable(tables.width, tables.height, _REGIONS)
+
+    def _count_blanks(self):
+        """Recount the blank squares and region counters from scratch. """
+        self._regions = self._tables.regions
+        blank = self._tables.full_mask & ~self._occupied
+        self._blanks = popcount(blank)
+        self._region_blanks = [popcount(mask & blank) for mask in self._regions.masks]
+
+    @property
+    def _board_state(self):
+        """The board state in the original list layout: one entry per cell
+        followed by initiative, player 2 location and player 1 location.
+        """
+        occupied = self._occupied
+        state = [(occupied >> idx) & 1 for idx in range(self.width * self.height)]
+        state.extend([self._initiative, self._p2_loc, self._p1_loc])
+        return state
+
+    @property
+    def zobrist_key(self):
+        """A 64-bit Zobrist key of the current game state covering blocked
+        cells, both player locations and initiative. The key is updated
+        incrementally by apply_move(), so reading it is O(1).
+        """
+        return self._key
+
+    @property
+    def tables(self):
+        """The `BoardTables` shared by every board of this size, which define
+        the square numbering and the knight move bitboards.
+        """
+        return self._tables
+
+    @property
+    def blocked_mask(self):
+        """A bitboard of the blocked squares, numbered as in `tables`. """
+        return self._occupied
 
     def hash(self):
-        return str(self._board_state).__hash__()
+        """Return a hash of the current state (public alias of __hash__). """
+        return self._key
+
+    def __hash__(self):
+        return self._key
+
+    def __eq__(self, other):
+        if not isinstance(other, Board):
+            return NotImplemented
+        return (self._key == other._key and self._occupied == other._occupied and
+                self._p1_loc == other._p1_loc and self._p2_loc == other._p2_loc and
+                self._initiative == other._initiative and
+                self.width == other.width and self.height == other.height)
+
+    def _compute_key(self):
+        """Compute the Zobrist key of the current state from scratch. """
+        tables = self._tables
+        key = 0
+        occupied = self._occupied
+        while occupied:
+            low = occupied & -occupied
+            key ^= tables.zobrist_blocked[low.bit_length() - 1]
+            occupied ^= low
+        if self._p1_loc != Board.NOT_MOVED:
+            key ^= tables.zobrist_p1[self._p1_loc]
+        if self._p2_loc != Board.NOT_MOVED:
+            key ^= tables.zobrist_p2[self._p2_loc]
+        if self._initiative:
+            key ^= tables.zobrist_initiative
+        return key
 
     @property
     def active_player(self):
@@ -69,6 +338,13 @@ class Board(object):
         """
         return self._inactive_player
 
+    @property
+    def initiative(self):
+        """0 if player 1 holds the initiative in the current game state, or 1
+        if player 2 does.
+        """
+        return self._initiative
+
     def get_opponent(self, player):
         """Return the opponent of the supplied player.
 
@@ -92,13 +368,46 @@ class Board(object):
 
     def copy(self):
         """ Return a deep copy of the current board. """
-        new_board = Board(self._player_1, self._player_2, width=self.width, height=self.height)
+        # Fill in the slots directly rather than running __init__()
+        new_board = self.__class__.__new__(self.__class__)
+        new_board.width = self.width
+        new_board.height = self.height
+        new_board.shuffle = self.shuffle
+        new_board._rng = self._rng
         new_board.move_count = self.move_count
+        new_board._player_1 = self._player_1
+        new_board._player_2 = self._player_2
+        new_board._tables = self._tables
         new_board._active_player = self._active_player
         new_board._inactive_player = self._inactive_player
-        new_board._board_state = copy(self._board_state)
+        new_board._occupied = self._occupied
+        new_board._p1_loc = self._p1_loc
+        new_board._p2_loc = self._p2_loc
+        new_board._initiative = self._initiative
+        new_board._key = self._key
+        new_board._p1_moves = self._p1_moves
+        new_board._p2_moves = self._p2_moves
+        new_board._undo_stack = []
+        new_board._regions = self._regions
+        new_board._blanks = self._blanks
+        new_board._region_blanks = list(self._region_blanks)
         return new_board
 
+    def __getstate__(self):
+        # Pickle only the game state; lookup tables and caches are rebuilt
+        return (self.width, self.height, self.shuffle, self.move_count, self._rng,
+                self._player_1, self._player_2, self._active_player, self._inactive_player,
+                self._occupied, self._p1_loc, self._p2_loc, self._initiative, self._key)
+
+    def __setstate__(self, state):
+        (self.width, self.height, self.shuffle, self.move_count, self._rng,
+         self._player_1, self._player_2, self._active_player, self._inactive_player,
+         self._occupied, self._p1_loc, self._p2_loc, self._initiative, self._key) = state
+        self._tables = board_tables(self.width, self.height)
+        self._p1_moves = self._p2_moves = None
+        self._undo_stack = []
+        self._count_blanks()
+
     def forecast_move(self, move):
         """Return a deep copy of the current game with an input move applied to
         advance the game one ply.
@@ -132,15 +441,43 @@ class Board(object):
         bool
             Returns True if the move is legal, False otherwise
         """
-        idx = move[0] + move[1] * self.height
         return (0 <= move[0] < self.height and 0 <= move[1] < self.width and
-                self._board_state[idx] == Board.BLANK)
+                not self._occupied >> (move[0] + move[1] * self.height) & 1)
 
     def get_blank_spaces(self):
         """Return a list of the locations that are still available on the board.
         """
-        return [(i, j) for j in range(self.width) for i in range(self.height)
-                if self._board_state[i + j * self.height] == Board.BLANK]
+        tables = self._tables
+        return list(tables.decode(tables.full_mask & ~self._occupied))
+
+    def count_blank_spaces(self):
+        """Return the number of locations that are still available on the
+        board. The count is maintained by apply_move(), so this is O(1).
+        """
+        return self._blanks
+
+    def count_region_blanks(self, name):
+        """Return the number of blank squares inside a region registered with
+        register_region(). The count is maintained by apply_move(), so this
+        is O(1).
+
+        Parameters
+        ----------
+        name : hashable
+            The name of a registered region; raises KeyError if no region
+            of that name is registered
+
+        Returns
+        -------
+        int
+            The number of blank squares in the region
+        """
+        slot = self._regions.slots.get(name)
+        if slot is not None:
+            return self._region_blanks[slot]
+        # The region was registered after this board was created
+        regions = self._tables.regions
+        return popcount(regions.masks[regions.slots[name]] & ~self._occupied)
 
     def get_player_location(self, player):
         """Find the current location of the specified player on the board.
@@ -156,20 +493,52 @@ class Board(object):
             The coordinate pair (row, column) of the input player, or None
             if the player has not moved.
         """
+        idx = self.get_player_square(player)
+        if idx == Board.NOT_MOVED:
+            return Board.NOT_MOVED
+        return self._tables.coords[idx]
+
+    def get_player_square(self, player):
+        """Return the square index (see `tables`) of the specified player, or
+        NOT_MOVED if the player has not been placed on the board yet.
+        """
+        if player == self._player_1:
+            return self._p1_loc
+        elif player == self._player_2:
+            return self._p2_loc
+        raise RuntimeError(
+            "Invalid player in get_player_location: {}".format(player))
+
+    def _moves_of(self, player):
+        """Return the cached tuple of legal moves for the specified player
+        (or the active player if None), computing it on first use.
+        """
+        if player is None:
+            player = self._active_player
         if player == self._player_1:
-            if self._board_state[-1] == Board.NOT_MOVED:
-                return Board.NOT_MOVED
-            idx = self._board_state[-1]
+            moves = self._p1_moves
+            if moves is None:
+                moves = self._p1_moves = self.__get_moves(self._p1_loc)
         elif player == self._player_2:
-            if self._board_state[-2] == Board.NOT_MOVED:
-                return Board.NOT_MOVED
-            idx = self._board_state[-2]
+            moves = self._p2_moves
+            if moves is None:
+                moves = self._p2_moves = self.__get_moves(self._p2_loc)
         else:
             raise RuntimeError(
                 "Invalid player in get_player_location: {}".format(player))
-        w = idx // self.height
-        h = idx % self.height
-        return (h, w)
+        return moves
+
+    def _active_moves(self):
+        """Return the cached tuple of legal moves for the active player. """
+        if self._initiative:
+            moves = self._p2_moves
+            if moves is None:
+                moves = self._p2_moves = self.__get_moves(self._p2_loc)
+        else:
+            moves = self._p1_moves
+            if moves is None:
+                moves = self._p1_moves = self.__get_moves(self._p1_loc)
+        return moves
 
     def get_legal_moves(self, player=None):
         """Return the list of all legal moves for the specified player.
@@ -187,8 +556,47 @@ class Board(object):
             for the player constrained by the current game state.
         """
         if player is None:
-            player = self.active_player
-        return self.__get_moves(self.get_player_location(player))
+            player = self._active_player
+        valid_moves = list(self._moves_of(player))
+        if self.shuffle and self.get_player_square(player) != Board.NOT_MOVED:
+            (random if self._rng is None else self._rng).shuffle(valid_moves)
+        return valid_moves
+
+    def iter_legal_moves(self, player=None, key=None):
+        """Return an iterator over the legal moves for the specified player.
+
+        Unlike get_legal_moves(), the moves are never shuffled and no list
+        is built: without `key` the iterator walks a tuple of moves shared by
+        every board of this size, so a search that stops early (e.g., at an
+        alpha-beta cutoff) pays nothing for the moves it never reaches.
+
+        Parameters
+        ----------
+        player : object (optional)
+            An object registered as a player in the current game. If None,
+            return the legal moves for the active player on the board.
+
+        key : callable (optional)
+            A function of one move used to order the moves, with the same
+            meaning as the `key` argument of `sorted()`. If None, moves are
+            produced in increasing square index order.
+
+        Returns
+        -------
+        iterator<(int, int)>
+            The coordinate pairs (row, column) of all legal moves for the
+            player constrained by the current game state.
+        """
+        moves = self._moves_of(player)
+        if key is not None:
+            return iter(sorted(moves, key=key))
+        return iter(moves)
+
+    def count_legal_moves(self, player=None):
+        """Return the number of legal moves for the specified player (the
+        active player if None), without building or shuffling a list of them.
+        """
+        return len(self._moves_of(player))
 
     def apply_move(self, move):
         """Move the active player to a specified location.
@@ -200,20 +608,66 @@ class Board(object):
             the active player on the board.
         """
         idx = move[0] + move[1] * self.height
-        last_move_idx = int(self.active_player == self._player_2) + 1
-        self._board_state[-last_move_idx] = idx
-        self._board_state[idx] = 1
-        self._board_state[-3] ^= 1
+        tables = self._tables
+        key = self._key ^ tables.zobrist_blocked[idx] ^ tables.zobrist_initiative
+        if self._initiative:
+            if self._p2_loc != Board.NOT_MOVED:
+                key ^= tables.zobrist_p2[self._p2_loc]
+            key ^= tables.zobrist_p2[idx]
+            self._p2_loc = idx
+        else:
+            if self._p1_loc != Board.NOT_MOVED:
+                key ^= tables.zobrist_p1[self._p1_loc]
+            key ^= tables.zobrist_p1[idx]
+            self._p1_loc = idx
+        self._key = key
+        self._occupied |= 1 << idx
+        self._initiative ^= 1
+        self._p1_moves = self._p2_moves = None
+        self._blanks -= 1
+        for slot in self._regions.square_slots[idx]:
+            self._region_blanks[slot] -= 1
         self._active_player, self._inactive_player = self._inactive_player, self._active_player
         self.move_count += 1
 
+    def push_move(self, move):
+        """Apply a move in-place like apply_move(), and record what is needed
+        to take it back with pop_move().
+
+        Searching with push_move()/pop_move() on a single board avoids the
+        board copy made for every node by forecast_move().
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+        """
+        self._undo_stack.append((self._occupied, self._p1_loc, self._p2_loc, self._key,
+                                 self._p1_moves, self._p2_moves))
+        self.apply_move(move)
+
+    def pop_move(self):
+        """Take back the last move applied with push_move(), restoring the
+        board to the state it had before that move.
+        """
+        idx = self._p1_loc if self._initiative else self._p2_loc
+        self._blanks += 1
+        for slot in self._regions.square_slots[idx]:
+            self._region_blanks[slot] += 1
+        (self._occupied, self._p1_loc, self._p2_loc, self._key,
+         self._p1_moves, self._p2_moves) = self._undo_stack.pop()
+        self._initiative ^= 1
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count -= 1
+
     def is_winner(self, player):
         """ Test whether the specified player has won the game. """
-        return player == self._inactive_player and not self.get_legal_moves(self._active_player)
+        return player == self._inactive_player and not self._active_moves()
 
     def is_loser(self, player):
         """ Test whether the specified player has lost the game. """
-        return player == self._active_player and not self.get_legal_moves(self._active_player)
+        return player == self._active_player and not self._active_moves()
 
     def utility(self, player):
         """Returns the utility of the current game state from the perspective
@@ -237,7 +691,7 @@ class Board(object):
             a value of -inf if the player has lost, and a value of 0
             otherwise.
         """
-        if not self.get_legal_moves(self._active_player):
+        if not self._active_moves():
 
             if player == self._inactive_player:
                 return float("inf")
@@ -247,20 +701,14 @@ class Board(object):
 
         return 0.
 
-    def __get_moves(self, loc):
-        """Generate the list of possible moves for an L-shaped motion (like a
-        knight in chess).
+    def __get_moves(self, idx):
+        """Generate the tuple of possible moves for an L-shaped motion (like a
+        knight in chess) from the input square index.
         """
-        if loc == Board.NOT_MOVED:
-            return self.get_blank_spaces()
-
-        r, c = loc
-        directions = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
-                      (1, -2), (1, 2), (2, -1), (2, 1)]
-        valid_moves = [(r + dr, c + dc) for dr, dc in directions
-                       if self.move_is_legal((r + dr, c + dc))]
-        random.shuffle(valid_moves)
-        return valid_moves
+        tables = self._tables
+        if idx == Board.NOT_MOVED:
+            return tables.decode(tables.full_mask & ~self._occupied)
+        return tables.decode_moves(tables.knight_masks[idx] & ~self._occupied)
 
     def print_board(self):
         """DEPRECATED - use Board.to_string()"""
@@ -271,8 +719,8 @@ class Board(object):
         the location of each player and indicating which cells have been
         blocked, and which remain open.
         """
-        p1_loc = self._board_state[-1]
-        p2_loc = self._board_state[-2]
+        p1_loc = self._p1_loc
+        p2_loc = self._p2_loc
 
         col_margin = len(str(self.height - 1)) + 1
         prefix = "{:<" + "{}".format(col_margin) + "}"
@@ -282,7 +730,7 @@ class Board(object):
             out += prefix.format(i) + ' | '
             for j in range(self.width):
                 idx = i + j * self.height
-                if not self._board_state[idx]:
+                if not self._occupied >> idx & 1:
                     out += ' '
                 elif p1_loc == idx:
                     out += symbols[0]
@@ -295,7 +743,7 @@ class Board(object):
 
         return out
 
-    def play(self, time_limit=TIME_LIMIT_MILLIS):
+    def play(self, time_limit=TIME_LIMIT_MILLIS, move_times=None):
         """Execute a match between the players by alternately soliciting them
         to select a move and applying it in the game.
 
@@ -303,7 +751,15 @@ class Board(object):
         ----------
         time_limit : numeric (optional)
             The maximum number of milliseconds to allow before timeout
-            during each turn.
+            during each turn. If None, turns are not timed: players are given
+            a `time_left` callable that always returns infinity, and are
+            expected to limit their own search (e.g., by a node or depth
+            budget).
+
+        move_times : list (optional)
+            If given, the number of milliseconds each player took to choose
+            each move is appended to this list, in the order the moves were
+            requested (including a final move that lost the game).
 
         Returns
         ----------
@@ -322,9 +778,14 @@ class Board(object):
             game_copy = self.copy()
 
             move_start = time_millis()
-            time_left = lambda : time_limit - (time_millis() - move_start)
+            if time_limit is None:
+                time_left = lambda : float("inf")
+            else:
+                time_left = lambda : time_limit - (time_millis() - move_start)
             curr_move = self._active_player.get_move(game_copy, time_left)
             move_end = time_left()
+            if move_times is not None:
+                move_times.append(time_millis() - move_start)
 
             if curr_move is None:
                 curr_move = Board.NOT_MOVED
@@ -341,5 +802,28 @@ class Board(object):
 
             self.apply_move(curr_move)
 
-    def setstate(self,state):
-        self._board_state = state
+    def getstate(self):
+        """Return the board state in the list layout read by setstate(). """
+        return self._board_state
+
+    def setstate(self, state):
+        """Load a board state given in the original list layout: one entry
+        per cell (0 for blank, 1 for blocked), followed by initiative, player
+        2 location and player 1 location (square index, or NOT_MOVED). The
+        player holding the initiative becomes the active player.
+        """
+        occupied = 0
+        for idx, cell in enumerate(state[:-3]):
+            if cell:
+                occupied |= 1 << idx
+        self._occupied = occupied
+        self._initiative = state[-3]
+        if self._initiative:
+            self._active_player, self._inactive_player = self._player_2, self._player_1
+        else:
+            self._active_player, self._inactive_player = self._player_1, self._player_2
+        self._p2_loc = state[-2]
+        self._p1_loc = state[-1]
+        self._key = self._compute_key()
+        self._p1_moves = self._p2_moves = None
+        self._count_blanks()
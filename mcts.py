@@ -0,0 +1,276 @@
+"""This file contains a Monte Carlo tree search agent that plugs into the same
+`get_move(game, time_left)` interface as the alpha-beta agents.
+
+The search tree is stored in flat parallel lists indexed by node number
+rather than in one object per node: the visit count, the wins, the move
+(square index) leading to the node, and the offset and number of its
+children. The children of a node are created together when it is expanded,
+so they occupy a contiguous block of node numbers. After each move the
+subtree of the position reached is copied to the front of fresh lists, and
+the next search continues from it.
+
+Playouts choose uniformly random legal moves like `RandomPlayer`, but run
+directly on the knight move bitboards of `isolation.Board.tables` instead of
+on a board.
+"""
+import math
+import random
+
+from isolation.isolation import popcount
+from game_agent import IsolationPlayer, SearchTimeout
+
+# The tree stops growing at this many nodes; playouts start from the leaves
+MAX_TREE_NODES = 2**19
+
+
+class MCTSPlayer(IsolationPlayer):
+    """Game-playing agent that chooses a move using Monte Carlo tree search
+    with the UCT selection rule, and plays the most visited root move.
+
+    Parameters
+    ----------
+    exploration : float (optional)
+        The exploration constant of the UCT rule: a child is selected by its
+        win rate plus ``exploration * sqrt(ln(N) / n)``, where n and N are
+        the visit counts of the child and of its parent.
+
+    reuse_tree : bool (optional)
+        Keep the subtree of the position reached after this player's move
+        and the opponent's reply for the next search.
+
+    seed : int (optional)
+        Seed for a private random number generator for the playouts. By
+        default the global generator is used, so that seeded games (see
+        `tournament.play_game`) reproduce.
+
+    timeout : float (optional)
+        See `game_agent.IsolationPlayer`.
+
+    node_limit : int (optional)
+        If set, the number of playouts per move; see
+        `game_agent.IsolationPlayer`.
+
+    stats : bool (optional)
+        See `game_agent.IsolationPlayer`; playouts are recorded as nodes.
+
+    Attributes
+    ----------
+    playouts : int
+        The number of playouts run by the last call to get_move().
+
+    reused : int
+        The number of visits of the root position that were carried over
+        from the previous search by the last call to get_move().
+    """
+    def __init__(self, exploration=1 / math.sqrt(2), reuse_tree=True, seed=None,
+                 timeout=10., node_limit=None, stats=False):
+        super().__init__(timeout=timeout, node_limit=node_limit, stats=stats)
+        self.exploration = exploration
+        self.reuse_tree = reuse_tree
+        self.playouts = 0
+        self.reused = 0
+        self._rng = random.Random(seed) if seed is not None else None
+        self._clear_tree()
+        self._expected = None
+        self._move_node = None
+
+    def _clear_tree(self):
+        self.visits = [0]
+        self.wins = [0.]
+        self.moves = [-1]
+        self.first_child = [0]
+        self.num_children = [-1]  # -1 until the node is expanded
+
+    def get_move(self, game, time_left):
+        """Search for the best move from the available legal moves and return a
+        result before the time limit expires.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            An instance of `isolation.Board` encoding the current state of the
+            game (e.g., player locations and blocked cells).
+
+        time_left : callable
+            A function that returns the number of milliseconds left in the
+            current turn. Returning with any less than 0 ms remaining forfeits
+            the game.
+
+        Returns
+        -------
+        (int, int)
+            Board coordinates corresponding to a legal move; may return
+            (-1, -1) if there are no available legal moves.
+        """
+        self.start_search(time_left)
+        legal_moves = game.get_legal_moves()
+        if not legal_moves:
+            return -1, -1
+
+        self._set_root(game)
+        self.reused = self.visits[0]
+        if self.stats is not None:
+            self.stats.start_move()
+        board = game.copy()
+        try:
+            while True:
+                self.check_budget()
+                self._iterate(board)
+        except SearchTimeout:
+            pass
+        self.playouts = self.nodes - 1
+        if self.stats is not None:
+            self.stats.end_move(self.playouts, None, self.budget_spent())
+
+        # Play the most visited root move
+        first, count = self.first_child[0], self.num_children[0]
+        if count <= 0:
+            return legal_moves[0]
+        best = max(range(first, first + count), key=self.visits.__getitem__)
+        move = game.tables.coords[self.moves[best]]
+        if self.reuse_tree:
+            self._expected = game.forecast_move(move)
+            self._move_node = best
+        return move
+
+    def _set_root(self, game):
+        """Make the node of the input position the root of the tree: the
+        grandchild of the old root that the game reached, or a new tree.
+        """
+        node = None
+        expected, self._expected = self._expected, None
+        if expected is not None and game.move_count == expected.move_count + 1:
+            reply = game.get_player_square(game.inactive_player)
+            expected.apply_move(game.tables.coords[reply])
+            if expected.zobrist_key == game.zobrist_key:
+                parent = self._move_node
+                first = self.first_child[parent]
+                for child in range(first, first + max(0, self.num_children[parent])):
+                    if self.moves[child] == reply:
+                        node = child
+                        break
+        if node is None:
+            self._clear_tree()
+        else:
+            self._compact(node)
+
+    def _compact(self, root):
+        """Copy the subtree of `root` to fresh lists, with `root` as node 0.
+        Nodes are copied in breadth-first order, so each block of children
+        stays contiguous.
+        """
+        visits, wins, moves = self.visits, self.wins, self.moves
+        first_child, num_children = self.first_child, self.num_children
+        old = [root]
+        self.visits = [visits[root]]
+        self.wins = [wins[root]]
+        self.moves = [moves[root]]
+        self.first_child = [0]
+        self.num_children = [num_children[root]]
+        i = 0
+        while i < len(old):
+            count = num_children[old[i]]
+            if count > 0:
+                first = first_child[old[i]]
+                self.first_child[i] = len(old)
+                for child in range(first, first + count):
+                    old.append(child)
+                    self.visits.append(visits[child])
+                    self.wins.append(wins[child])
+                    self.moves.append(moves[child])
+                    self.first_child.append(0)
+                    self.num_children.append(num_children[child])
+            i += 1
+
+    def _iterate(self, board):
+        """Run one selection, expansion, playout and backpropagation step
+        from the root position `board`, which is restored afterwards.
+        """
+        visits, wins, moves = self.visits, self.wins, self.moves
+        first_child, num_children = self.first_child, self.num_children
+        coords = board.tables.coords
+        log, sqrt, c = math.log, math.sqrt, self.exploration
+
+        # Selection: descend through expanded nodes by the UCT rule
+        node = 0
+        path = [0]
+        while num_children[node] > 0:
+            first = first_child[node]
+            best, best_value = first, -1.
+            log_n = log(visits[node])
+            for child in range(first, first + num_children[node]):
+                n = visits[child]
+                if n == 0:
+                    best = child
+                    break
+                value = wins[child] / n + c * sqrt(log_n / n)
+                if value > best_value:
+                    best, best_value = child, value
+            node = best
+            board.push_move(coords[moves[node]])
+            path.append(node)
+
+        # Expansion: add every child of the leaf at once, then play out
+        # from one of them
+        if num_children[node] < 0 and len(visits) < MAX_TREE_NODES:
+            squares = [m[0] + m[1] * board.height for m in board.iter_legal_moves()]
+            first_child[node] = len(visits)
+            num_children[node] = len(squares)
+            for square in squares:
+                visits.append(0)
+                wins.append(0.)
+                moves.append(square)
+                first_child.append(0)
+                num_children.append(-1)
+            if squares:
+                node = first_child[node] + (self._rng or random).randrange(len(squares))
+                board.push_move(coords[moves[node]])
+                path.append(node)
+
+        # The node's wins count the wins of the player who moved into it
+        reward = 0. if self._playout(board) else 1.
+        for node in reversed(path):
+            visits[node] += 1
+            wins[node] += reward
+            reward = 1. - reward
+        for _ in range(len(path) - 1):
+            board.pop_move()
+
+    def _playout(self, board):
+        """Play uniformly random moves from the input position to the end of
+        the game, and return True if the player to move wins.
+        """
+        rng = self._rng or random
+        plies = 0
+        if (board.get_player_square(board.active_player) is None
+                or board.get_player_square(board.inactive_player) is None):
+            # Placing a player is not a knight move; finish the placements
+            # on a copy of the board. Boards loaded with setstate() do not
+            # count their moves, so the player squares are checked instead
+            # of move_count
+            board = board.copy()
+            while (board.get_player_square(board.active_player) is None
+                   or board.get_player_square(board.inactive_player) is None):
+                moves = board.get_legal_moves()
+                if not moves:
+                    return plies % 2 == 1
+                board.apply_move(rng.choice(moves))
+                plies += 1
+
+        tables = board.tables
+        masks = tables.knight_masks
+        free = tables.full_mask & ~board.blocked_mask
+        active = board.get_player_square(board.active_player)
+        inactive = board.get_player_square(board.inactive_player)
+        while True:
+            moves = masks[active] & free
+            if not moves:
+                break
+            for _ in range(rng.randrange(popcount(moves))):
+                moves &= moves - 1
+            square = (moves & -moves).bit_length() - 1
+            free &= ~(1 << square)
+            active, inactive = inactive, square
+            plies += 1
+        # The player to move at the end loses
+        return plies % 2 == 1
@@ -0,0 +1,133 @@
+"""This file contains the move ordering heuristics used by the alpha-beta
+search in `game_agent.py`. Searching the best move first at each node makes
+alpha-beta prune as much of the tree as possible, so better ordering turns
+directly into deeper completed iterations within the same time limit.
+"""
+from collections import defaultdict
+
+# Sort keys that rank the principal variation move and the killer moves
+# ahead of every move ranked by the history table
+PV_KEY = float("inf")
+KILLER_KEY = 10**18
+
+
+class MoveOrderer(object):
+    """Order moves by: the principal variation (hash) move, then the killer
+    moves recorded for the current ply, then the history heuristic.
+
+    Parameters
+    ----------
+    num_killers : int (optional)
+        The number of killer moves remembered for each ply.
+
+    Attributes
+    ----------
+    killers : list<list<(int, int)>>
+        For each ply from the root, the most recent moves that caused a
+        cutoff at that ply, most recent first.
+
+    history : (defaultdict, defaultdict)
+        For each side (see `isolation.Board.initiative`), a mapping from a
+        move to the sum of ``depth ** 2`` over the cutoffs it caused.
+    """
+    def __init__(self, num_killers=2):
+        self.num_killers = num_killers
+        self.killers = []
+        self.history = (defaultdict(int), defaultdict(int))
+        self._buffers = []
+
+    def new_search(self):
+        """Prepare for searching a new root position. Killer moves are tied
+        to plies from the old root, so they are dropped; history scores are
+        halved so that recent cutoffs dominate.
+        """
+        self.killers = []
+        for table in self.history:
+            for move in table:
+                table[move] //= 2
+
+    def order(self, moves, ply, side, pv_move=None):
+        """Return the input moves sorted from most to least promising.
+
+        Parameters
+        ----------
+        moves : list<(int, int)>
+            The legal moves at the current node
+
+        ply : int
+            The distance of the current node from the root
+
+        side : int
+            The side to move at the current node (`Board.initiative`)
+
+        pv_move : (int, int) (optional)
+            The best move from the previous iteration or the transposition
+            table, which is tried first if it is legal
+
+        Returns
+        -------
+        list<(int, int)>
+            The ordered moves
+        """
+        return sorted(moves, key=self.sort_key(ply, side, pv_move))
+
+    def order_moves(self, moves, ply, side, pv_move=None):
+        """Return the input moves in the same order as `order`, in a list
+        that is reused by every node at the same ply.
+
+        The search calls this at every interior node, so no key function or
+        new list is built: the buffer of the ply is sorted by the history
+        table, and the killer moves and the principal variation move are
+        then moved to its front. The list is only valid until the next call
+        for the same ply.
+        """
+        buffers = self._buffers
+        while len(buffers) <= ply:
+            buffers.append([])
+        buffer = buffers[ply]
+        buffer[:] = moves
+        # The sort is stable, so reverse=True keeps ties in their input order
+        buffer.sort(key=self.history[side].__getitem__, reverse=True)
+        if ply < len(self.killers):
+            for move in reversed(self.killers[ply]):
+                if move in buffer:
+                    buffer.remove(move)
+                    buffer.insert(0, move)
+        if pv_move is not None and pv_move in buffer:
+            buffer.remove(pv_move)
+            buffer.insert(0, pv_move)
+        return buffer
+
+    def sort_key(self, ply, side, pv_move=None):
+        """Return a `key` function for `sorted()` or
+        `isolation.Board.iter_legal_moves()` that puts the most promising
+        moves first. The parameters are the same as for `order`.
+        """
+        history = self.history[side]
+        killers = self.killers[ply] if 0 <= ply < len(self.killers) else ()
+
+        def sort_key(move):
+            if move == pv_move:
+                return -PV_KEY
+            if move in killers:
+                return killers.index(move) - KILLER_KEY
+            return -history.get(move, 0)
+
+        return sort_key
+
+    def record_cutoff(self, move, ply, side, depth):
+        """Update the killer moves and the history table after `move` caused
+        a cutoff at a node `ply` plies from the root with `depth` plies left
+        to search.
+        """
+        if ply >= 0:
+            while len(self.killers) <= ply:
+                self.killers.append([])
+            killers = self.killers[ply]
+            if move in killers:
+                killers.remove(move)
+            killers.insert(0, move)
+            del killers[self.num_killers:]
+
+        history = self.history[side]
+        history[move] += depth * depth
@@ -0,0 +1,238 @@
+"""This file contains an opening book for the early plies of Isolation, and
+the offline tool that builds it by running deep alpha-beta searches from
+the opening positions: every position up to one move after the two
+placements, and the early middle game lines that follow the book's own
+moves (see `book_levels`).
+
+Positions are stored under a symmetry-reduced key (see `symmetry.py`): a
+board and its mirror images and rotations (8 symmetries on square boards, 4
+otherwise) share one entry, with the book move given in the coordinates of
+the canonical orientation. Looking up a position transforms it to its
+canonical orientation and maps the stored move back to the actual board.
+
+Build the book of the competition agent (`data.json`) with:
+
+    python opening_book.py --plies 6 --depth 10 --processes 4
+"""
+import argparse
+import json
+import os
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+from isolation import Board
+from game_agent import AlphaBetaPlayer, custom_score_2
+from symmetry import canonical_key, inverse
+
+# The competition uploads the book with the agent as `data.json`, which
+# `competition_agent.CustomPlayer` reads by default
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data.json")
+
+BOOK_PLIES = 6  # book positions have fewer than this many moves played
+BOOK_DEPTH = 10  # search depth used to choose the book moves
+
+# Tournament games start with this many random moves (the placements of both
+# players), so every position with at most one more move played is in the
+# book. Later book positions are only those reached when the player to move
+# played its book move two plies earlier, and the opponent replied with any
+# legal move
+RANDOM_PLIES = 2
+
+
+class OpeningBook(object):
+    """A mapping from symmetry-reduced opening positions to book moves.
+
+    Parameters
+    ----------
+    width, height : int
+        The board size the book was built for
+
+    moves : dict (optional)
+        A mapping from `canonical_key` keys to (row, column) moves in the
+        canonical orientation
+
+    plies : int (optional)
+        The book only holds positions with fewer than this many moves played
+    """
+    def __init__(self, width=7, height=7, moves=None, plies=BOOK_PLIES):
+        self.width = width
+        self.height = height
+        self.moves = moves if moves is not None else {}
+        self.plies = plies
+
+    def __len__(self):
+        return len(self.moves)
+
+    def lookup(self, game):
+        """Return the book move for the active player of the input game, or
+        None if the position is not in the book.
+        """
+        if (game.width, game.height) != (self.width, self.height) or game.move_count >= self.plies:
+            return None
+        key, transform = canonical_key(game)
+        move = self.moves.get(key)
+        if move is None:
+            return None
+        move = inverse(self.width, self.height, transform)(*move)
+        return move if game.move_is_legal(move) else None
+
+    def add(self, game, move):
+        """Record `move` as the book move of the input position. """
+        key, transform = canonical_key(game)
+        self.moves[key] = transform(*move)
+
+    def save(self, path):
+        data = {"width": self.width, "height": self.height, "plies": self.plies,
+                "moves": {key: list(move) for key, move in sorted(self.moves.items())}}
+        with open(path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["width"], data["height"],
+                   {key: tuple(move) for key, move in data["moves"].items()},
+                   data.get("plies", BOOK_PLIES))
+
+
+_BOOKS = {}
+
+
+def load_book(path=BOOK_FILE):
+    """Return the book stored in the input file, reading the file the first
+    time it is requested. A missing file gives an empty book.
+    """
+    book = _BOOKS.get(path)
+    if book is None:
+        book = OpeningBook.load(path) if os.path.exists(path) else OpeningBook()
+        _BOOKS[path] = book
+    return book
+
+
+def _successors(width, height, positions, book=None):
+    """Return the move sequences leading to one representative of every
+    symmetry class of positions reached from the input move sequences by any
+    legal move or, if a book is given, by the book move followed by any
+    legal reply. Positions without a book move continue with their first
+    legal move.
+    """
+    successors = {}
+    for moves in positions:
+        game = _replay(width, height, moves, "Player1", "Player2")
+        if book is not None:
+            move = book.lookup(game) or next(game.iter_legal_moves(), None)
+            if move is None:
+                continue
+            game.apply_move(move)
+            moves = moves + [move]
+        for reply in game.iter_legal_moves():
+            key, _ = canonical_key(game.forecast_move(reply))
+            successors.setdefault(key, moves + [reply])
+    return list(successors.values())
+
+
+def book_levels(width, height, plies, book):
+    """Yield, for each number of moves played below `plies`, the move
+    sequences leading to one representative of every symmetry class of book
+    positions with that many moves played (see `RANDOM_PLIES`).
+
+    The moves of each level must be added to `book` before the level two
+    plies later is requested, since that level follows them.
+    """
+    levels = [[[]]]
+    yield levels[0]
+    for ply in range(1, plies):
+        if ply <= RANDOM_PLIES + 1:
+            levels.append(_successors(width, height, levels[-1]))
+        else:
+            levels.append(_successors(width, height, levels[-2], book))
+        yield levels[-1]
+
+
+def _has_choice(width, height, moves):
+    return len(_replay(width, height, moves, "Player1", "Player2").get_legal_moves()) > 1
+
+
+def opening_positions(width, height, plies, book=None):
+    """Return the move sequences leading to the book positions with fewer
+    than `plies` moves played (see `book_levels`) in which the active
+    player has a choice of moves. The lines beyond `RANDOM_PLIES` + 1 moves
+    follow the moves of `book`, or the first legal move without a book.
+    """
+    book = book if book is not None else OpeningBook(width, height)
+    return [moves for level in book_levels(width, height, plies, book) for moves in level
+            if _has_choice(width, height, moves)]
+
+
+def _replay(width, height, moves, player_1, player_2):
+    game = Board(player_1, player_2, width, height, shuffle=False)
+    for move in moves:
+        game.apply_move(move)
+    return game
+
+
+def search_position(args):
+    """Return the move chosen by a depth-limited alpha-beta search from the
+    position reached by playing the input moves.
+
+    Parameters
+    ----------
+    args : (int, int, list<(int, int)>, int)
+        The board width and height, the moves leading to the position, and
+        the search depth
+    """
+    width, height, moves, depth = args
+    player = AlphaBetaPlayer(score_fn=custom_score_2, depth_limit=depth)
+    if len(moves) % 2 == 0:
+        game = _replay(width, height, moves, player, "Opponent")
+    else:
+        game = _replay(width, height, moves, "Opponent", player)
+    return player.get_move(game, lambda: float("inf"))
+
+
+def build_book(width=7, height=7, plies=BOOK_PLIES, depth=BOOK_DEPTH, executor=None):
+    """Return an `OpeningBook` holding the move chosen by a `depth` ply
+    search for every book position with fewer than `plies` moves played (see
+    `book_levels`). The searches are spread across the workers of
+    `executor` if one is given.
+    """
+    book = OpeningBook(width, height, plies=plies)
+    for level in book_levels(width, height, plies, book):
+        positions = [moves for moves in level if _has_choice(width, height, moves)]
+        jobs = [(width, height, moves, depth) for moves in positions]
+        results = map(search_position, jobs) if executor is None else executor.map(search_position, jobs)
+        for moves, move in zip(positions, results):
+            book.add(_replay(width, height, moves, "Player1", "Player2"), move)
+    return book
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Build the opening book of the competition agent.")
+    parser.add_argument("-o", "--output", default=BOOK_FILE,
+                        help="the book file to write (default: {})".format(BOOK_FILE))
+    parser.add_argument("--plies", type=int, default=BOOK_PLIES,
+                        help="cover positions with fewer than this many moves played "
+                             "(default: {})".format(BOOK_PLIES))
+    parser.add_argument("--depth", type=int, default=BOOK_DEPTH,
+                        help="search depth of each book position (default: {})".format(BOOK_DEPTH))
+    parser.add_argument("--size", type=int, nargs=2, default=(7, 7), metavar=("WIDTH", "HEIGHT"),
+                        help="board size (default: 7 7)")
+    parser.add_argument("-p", "--processes", type=int, default=1,
+                        help="number of worker processes searching positions in parallel (default: 1)")
+    args = parser.parse_args(args)
+
+    start = time.time()
+    width, height = args.size
+    if args.processes > 1:
+        with ProcessPoolExecutor(max_workers=args.processes) as executor:
+            book = build_book(width, height, args.plies, args.depth, executor)
+    else:
+        book = build_book(width, height, args.plies, args.depth)
+    book.save(args.output)
+    print("Wrote {} positions to {} in {:.1f}s".format(len(book), args.output, time.time() - start))
+
+
+if __name__ == "__main__":
+    main()
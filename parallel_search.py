@@ -0,0 +1,191 @@
+"""This file contains a parallel version of the alpha-beta agent that splits
+the root moves of every search across a pool of worker processes.
+
+Each worker rebuilds the position from its list state (see
+`isolation.Board.getstate`), runs iterative deepening over its share of the
+root moves, and returns the best move and exact score of every depth it
+completed before the deadline. Workers keep their own search agent, and its
+transposition table, between moves. The deadline is sent as an absolute
+`time.time()` value, since the `time_left` callable of a move cannot be
+shared between processes.
+"""
+import os
+import time
+
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from isolation import Board
+from game_agent import AlphaBetaPlayer, SearchTimeout, custom_score_2
+
+# Milliseconds reserved for sending results back to the main process
+COLLECT_MARGIN = 20.
+
+
+# The search agent of each worker process, by agent configuration
+_WORKER_PLAYERS = {}
+
+# Seconds each warm-up task keeps its worker busy, so that the tasks are
+# spread over all the workers of the pool
+WARM_UP_SECONDS = 0.05
+
+
+def _worker_player(config):
+    """Return the search agent of this worker process for an agent
+    configuration, creating it on first use.
+    """
+    key = tuple(sorted(config.items()))
+    player = _WORKER_PLAYERS.get(key)
+    if player is None:
+        player = _WORKER_PLAYERS[key] = AlphaBetaPlayer(**config)
+    return player
+
+
+def warm_up(config):
+    """Start a worker process and create its search agent ahead of the first
+    search.
+    """
+    _worker_player(config)
+    time.sleep(WARM_UP_SECONDS)
+
+
+def search_root_moves(args):
+    """Run iterative deepening over a subset of the root moves of a position
+    in a worker process.
+
+    Parameters
+    ----------
+    args : (dict, int, int, list, list<(int, int)>, float)
+        The `AlphaBetaPlayer` keyword arguments of the agent, the board width
+        and height, the board state, the root moves to search, and the
+        absolute `time.time()` deadline of the search
+
+    Returns
+    -------
+    dict
+        A mapping from each completed depth to the (score, move) pair of the
+        best move at that depth
+    """
+    config, width, height, state, moves, deadline = args
+    player = _worker_player(config)
+
+    # The agent always takes the seat of the player to move
+    if state[-3]:
+        game = Board("Opponent", player, width, height)
+    else:
+        game = Board(player, "Opponent", width, height)
+    game.setstate(state)
+
+    player.use_board(game)
+    player.start_search(lambda: 1000 * (deadline - time.time()))
+    if player.tt is not None:
+        player.tt.new_search()
+    if player.orderer is not None:
+        player.orderer.new_search()
+
+    results = {}
+    max_depth = game.count_blank_spaces()
+    if player.depth_limit is not None:
+        max_depth = min(max_depth, player.depth_limit)
+    try:
+        for depth in range(1, max_depth + 1):
+            results[depth] = player.search_moves(game, depth, moves)
+    except SearchTimeout:
+        pass
+    return results
+
+
+class ParallelAlphaBetaPlayer(AlphaBetaPlayer):
+    """Alpha-beta agent that splits the root moves of its iterative deepening
+    search across a pool of worker processes.
+
+    The best move is taken from the deepest iteration that every worker
+    completed, so all root moves are compared at the same depth. Workers stop
+    `COLLECT_MARGIN` milliseconds earlier than the timer threshold requires,
+    so that their results arrive in time. If a worker still misses the
+    deadline, or completes no iteration, the search has no result covering
+    every root move and the agent plays the first move in search order (the
+    principal variation move when there is one).
+
+    The score function must be defined at module level so that it can be
+    sent to the workers. The pool is started and warmed up by the
+    constructor, outside the time of any move. It is not copied along with
+    the agent: call start() on a copy before its first timed move.
+
+    With ``stats=True``, only the work of the main process is counted: the
+    nodes searched by the workers are not reported back.
+
+    Parameters
+    ----------
+    processes : int (optional)
+        The number of worker processes; by default, one per CPU. With a single
+        process, the agent searches in the main process like
+        `AlphaBetaPlayer`.
+
+    Other parameters are the same as for `game_agent.AlphaBetaPlayer`.
+    """
+    def __init__(self, search_depth=3, score_fn=custom_score_2, timeout=10.,
+                 node_limit=None, depth_limit=None, tt_entries=2**16, processes=None, **kwargs):
+        super().__init__(search_depth, score_fn, timeout, node_limit, depth_limit,
+                         tt_entries, **kwargs)
+        self.processes = processes or os.cpu_count() or 1
+        self._config = dict(score_fn=score_fn, timeout=timeout, node_limit=node_limit,
+                            depth_limit=depth_limit, tt_entries=tt_entries)
+        self._config.update((name, value) for name, value in kwargs.items()
+                            if not name.startswith("ponder") and name != "stats")
+        self._executor = None
+        self.start()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        return state
+
+    def start(self):
+        """Start the worker processes if they are not running, and wait until
+        every worker has created its search agent.
+        """
+        if self.processes < 2 or self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(max_workers=self.processes)
+        wait([self._executor.submit(warm_up, self._config) for _ in range(self.processes)])
+
+    def close(self):
+        """Shut down the worker processes. """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def iterative_deepening(self, game):
+        """Search the root moves of the input position in parallel, and
+        return the best move of the deepest iteration completed for every
+        root move.
+        """
+        moves = game.get_legal_moves()
+        if self.processes < 2 or len(moves) < 2:
+            return super().iterative_deepening(game)
+        self.start()
+
+        # Deal the moves out in turn, so every worker gets a mix of the
+        # moves searched early and late in the usual order
+        if self.orderer is not None:
+            moves = self.orderer.order(moves, 0, game.initiative, self._pv_move)
+        shares = [moves[i::self.processes] for i in range(min(self.processes, len(moves)))]
+
+        time_left = self.time_left()
+        deadline = time.time() + (time_left - COLLECT_MARGIN) / 1000.
+        state = game.getstate()
+        futures = [self._executor.submit(search_root_moves, (
+            self._config, game.width, game.height, state, share, deadline)) for share in shares]
+        timeout = None if time_left == float("inf") else max(
+            0., (self.time_left() - self.TIMER_THRESHOLD) / 1000.)
+        done, _ = wait(futures, timeout=timeout)
+
+        # Only results that cover every root move replace the first move
+        results = [future.result() for future in done]
+        if len(done) < len(futures) or not all(results):
+            self.stop_reason = "timeout"
+            self.completed_depth = None
+            return moves[0]
+        self.stop_reason = "depth"
+        depth = self.completed_depth = min(max(result) for result in results)
+        return max((result[depth] for result in results), key=lambda x: x[0])[1]
@@ -0,0 +1,226 @@
+"""This file contains a perft ("performance test") for `isolation.Board`: the
+number of positions reached after exactly N plies from a given position.
+Perft walks every line of play, so it exercises move generation, including
+the rule that a player who has not moved yet may be placed on any blank
+square, and push_move()/pop_move() at every node. Comparing its counts on
+the reference positions below proves that a new board backend generates the
+same moves as this one, and timing it measures the backend's raw speed.
+
+Verify the reference counts and report the positions counted per second
+with:
+
+    python perft.py [--memo] [--max-nodes N]
+
+or time a single position from the empty board with:
+
+    python perft.py --size 9 9 --depth 4
+"""
+import argparse
+import time
+
+from collections import namedtuple
+
+from isolation import Board
+from symmetry import symmetries
+
+# A reference position: its name, the board size, the moves played from the
+# empty board, and the number of positions reached after 1, 2, ... plies.
+# Games that end before the last ply reach no positions at that ply. The
+# counts were computed by an independent move generator working on
+# coordinate sets instead of bitboards
+PerftPosition = namedtuple("PerftPosition", ["name", "width", "height", "moves", "counts"])
+
+REFERENCE_POSITIONS = [
+    PerftPosition("7x7 empty", 7, 7, [], [49, 2352, 11280, 52672, 232416]),
+    PerftPosition("7x7 one player placed", 7, 7, [(3, 3)], [48, 376, 1712, 8256, 34848]),
+    PerftPosition("7x7 middle game", 7, 7,
+                  [(1, 1), (2, 5), (3, 0), (0, 4), (5, 1), (2, 3), (4, 3), (4, 4)],
+                  [7, 42, 172, 517, 1645, 5297, 16396, 56860, 188819]),
+    PerftPosition("7x7 endgame", 7, 7,
+                  [(3, 0), (6, 0), (1, 1), (5, 2), (3, 2), (3, 3), (5, 1), (5, 4), (4, 3), (6, 6),
+                   (3, 1), (4, 5), (2, 3), (2, 6), (3, 5), (0, 5), (1, 6), (2, 4), (0, 4), (1, 2)],
+                  [1, 2, 8, 12, 28, 80, 203, 509, 1073, 1978, 3690, 6215, 9324, 15444, 19729,
+                   21669, 21014, 22554, 20352, 15348, 8846, 6453, 4373, 1780, 372, 195, 122, 28,
+                   0]),
+    PerftPosition("9x9 empty", 9, 9, [], [81, 6480, 35392, 190432]),
+    PerftPosition("9x9 middle game", 9, 9,
+                  [(3, 3), (3, 4), (4, 1), (2, 6), (6, 2), (0, 5), (5, 0), (1, 3), (3, 1), (2, 5),
+                   (4, 3), (0, 6), (5, 1), (1, 4), (6, 3), (3, 5)],
+                  [7, 42, 167, 829, 3570, 13011, 45964, 169288, 618877]),
+]
+
+# Subtrees of fewer plies than this are counted by `perft_memo` without the
+# memo, and the memo keys are only symmetry-reduced in positions with fewer
+# than SYMMETRY_PLIES moves played: later, symmetric positions are too rare
+# to pay for reducing the key
+MEMO_MIN_DEPTH = 3
+SYMMETRY_PLIES = 4
+
+# The outcome of one perft run on a reference position: the position name,
+# the depth, the expected and the actual count, and the seconds it took
+PerftResult = namedtuple("PerftResult", ["name", "depth", "expected", "count", "seconds"])
+
+
+def perft(game, depth):
+    """Return the number of positions reached after exactly `depth` plies
+    from the input position. The board is searched in place with
+    push_move()/pop_move() and is left unchanged.
+    """
+    if depth == 0:
+        return 1
+    count = 0
+    for move in game.iter_legal_moves():
+        game.push_move(move)
+        count += perft(game, depth - 1)
+        game.pop_move()
+    return count
+
+
+# The square permutations of the board symmetries, by board size
+_PERMUTATIONS = {}
+
+
+def _permutations(tables):
+    """Return the board symmetries of `symmetry.symmetries` as square
+    index permutations, without the identity.
+    """
+    size = (tables.width, tables.height)
+    perms = _PERMUTATIONS.get(size)
+    if perms is None:
+        perms = _PERMUTATIONS[size] = [
+            [row + col * tables.height for row, col in (transform(*cell) for cell in tables.coords)]
+            for transform in symmetries(*size)[1:]]
+    return perms
+
+
+def _memo_key(game, depth):
+    """Return the memo key of a subtree: the plies to go, and the smallest
+    (blocked squares, active square, inactive square) triple over the
+    symmetric images of the position (see `SYMMETRY_PLIES`).
+    """
+    active = game.get_player_square(game.active_player)
+    inactive = game.get_player_square(game.inactive_player)
+    best = (game.blocked_mask, active, inactive)
+    if game.move_count >= SYMMETRY_PLIES:
+        return depth, best
+    for perm in _permutations(game.tables):
+        bits, blocked = game.blocked_mask, 0
+        while bits:
+            low = bits & -bits
+            blocked |= 1 << perm[low.bit_length() - 1]
+            bits ^= low
+        key = (blocked, None if active is None else perm[active],
+               None if inactive is None else perm[inactive])
+        if key < best:
+            best = key
+    return depth, best
+
+
+def perft_memo(game, depth, memo=None):
+    """Return the same count as `perft`, remembering the count of every
+    subtree of at least `MEMO_MIN_DEPTH` plies in the dict `memo` (a new one
+    if not given).
+
+    In the opening, most subtrees are mirror images or rotations of one
+    already counted, and the symmetry-reduced memo keys (as in
+    `opening_book`) make perft from an empty board several times faster.
+    Later positions are only shared when different move orders reach them,
+    which the knight paths of Isolation make rare, so from the middle game
+    on the memo costs more than it saves. Keys are exact game states rather
+    than Zobrist keys, so a hash collision cannot change the count.
+    """
+    if depth < MEMO_MIN_DEPTH:
+        return perft(game, depth)
+    if memo is None:
+        memo = {}
+    key = _memo_key(game, depth)
+    count = memo.get(key)
+    if count is not None:
+        return count
+    count = 0
+    for move in game.iter_legal_moves():
+        game.push_move(move)
+        count += perft_memo(game, depth - 1, memo)
+        game.pop_move()
+    memo[key] = count
+    return count
+
+
+def timed_perft(game, depth, memo=False):
+    """Return the perft count of the input position and the seconds it took,
+    using `perft_memo` with a fresh memo if `memo` is True.
+    """
+    start = time.perf_counter()
+    count = perft_memo(game, depth) if memo else perft(game, depth)
+    return count, time.perf_counter() - start
+
+
+def reference_board(position):
+    """Return a board with the moves of a `PerftPosition` applied. """
+    game = Board("Player1", "Player2", position.width, position.height, shuffle=False)
+    for move in position.moves:
+        game.apply_move(move)
+    return game
+
+
+def run_suite(positions=REFERENCE_POSITIONS, max_nodes=None, memo=False):
+    """Return a `PerftResult` for every depth of every reference position,
+    stopping at the first depth of a position that would visit more than
+    `max_nodes` positions (the sum of the counts up to that depth).
+    """
+    results = []
+    for position in positions:
+        game = reference_board(position)
+        for depth, expected in enumerate(position.counts, 1):
+            if max_nodes is not None and sum(position.counts[:depth]) > max_nodes:
+                break
+            count, seconds = timed_perft(game, depth, memo)
+            results.append(PerftResult(position.name, depth, expected, count, seconds))
+    return results
+
+
+def _rate(count, seconds):
+    return "{:.0f}".format(count / seconds) if seconds > 0 else "-"
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Count and time the positions reached by "
+                                                 "isolation.Board move generation.")
+    parser.add_argument("--memo", action="store_true",
+                        help="remember subtree counts, sharing symmetric opening positions "
+                             "(see perft_memo)")
+    parser.add_argument("--max-nodes", type=int, default=None,
+                        help="skip reference depths that visit more than this many positions")
+    parser.add_argument("--size", type=int, nargs=2, default=None, metavar=("WIDTH", "HEIGHT"),
+                        help="instead of the reference suite, run perft from the empty board "
+                             "of this size")
+    parser.add_argument("-d", "--depth", type=int, default=3,
+                        help="the depth of the --size run (default: 3)")
+    args = parser.parse_args(args)
+
+    if args.size is not None:
+        game = Board("Player1", "Player2", *args.size, shuffle=False)
+        count, seconds = timed_perft(game, args.depth, args.memo)
+        print("perft({}) = {} in {:.3f}s ({} positions/s)".format(
+            args.depth, count, seconds, _rate(count, seconds)))
+        return
+
+    results = run_suite(max_nodes=args.max_nodes, memo=args.memo)
+    failed = 0
+    print("{:>24} {:>5} {:>10} {:>10} {:>12}  ".format(
+        "Position", "Depth", "Count", "Seconds", "Positions/s"))
+    for result in results:
+        ok = result.count == result.expected
+        failed += not ok
+        print("{:>24} {:>5} {:>10} {:>10.3f} {:>12}  {}".format(
+            result.name, result.depth, result.count, result.seconds,
+            _rate(result.count, result.seconds), "ok" if ok else "expected {}".format(result.expected)))
+    total = sum(result.count for result in results)
+    seconds = sum(result.seconds for result in results)
+    print("\n{} positions in {:.3f}s ({} positions/s)".format(total, seconds, _rate(total, seconds)))
+    if failed:
+        parser.exit(1, "{} of {} counts differ from the reference\n".format(failed, len(results)))
+
+
+if __name__ == "__main__":
+    main()
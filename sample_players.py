@@ -9,6 +9,15 @@ own agent and example heuristic functions.
 from random import randint
 
 
+def count_legal_moves(game, player):
+    """Return the number of legal moves of the given player, without building
+    or shuffling a list of them on boards that support it.
+    """
+    if hasattr(game, "count_legal_moves"):
+        return game.count_legal_moves(player)
+    return len(game.get_legal_moves(player))
+
+
 def null_score(game, player):
     """This heuristic presumes no knowledge for non-terminal states, and
     returns the same uninformative value for all other states.
@@ -65,7 +74,7 @@ def open_move_score(game, player):
     if game.is_winner(player):
         return float("inf")
 
-    return float(len(game.get_legal_moves(player)))
+    return float(count_legal_moves(game, player))
 
 
 def improved_score(game, player):
@@ -95,8 +104,8 @@ def improved_score(game, player):
     if game.is_winner(player):
         return float("inf")
 
-    own_moves = len(game.get_legal_moves(player))
-    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
+    own_moves = count_legal_moves(game, player)
+    opp_moves = count_legal_moves(game, game.get_opponent(player))
     return float(own_moves - opp_moves)
 
 
@@ -0,0 +1,92 @@
+"""This file contains the optional search instrumentation of the agents in
+`game_agent.py`: a per-move record of how much and how well each search
+worked, and the summary `tournament.py` prints for each agent.
+
+Agents only collect statistics when they are constructed with
+``stats=True``. The search then counts heuristic evaluations and beta
+cutoffs as it goes; everything else is read once per move.
+"""
+import time
+
+from collections import namedtuple
+
+# The statistics of one move: the nodes searched and nodes per second, the
+# deepest completed iteration (None if not applicable), the beta cutoffs and
+# how many of them the first move searched at the node caused, the heuristic
+# evaluations, the milliseconds used, the transposition table probes and
+# hits, and why the search stopped ("depth", "timeout", "nodes",
+# "time manager" or "endgame"). For `mcts.MCTSPlayer`, nodes are playouts
+MoveStats = namedtuple("MoveStats", ["nodes", "nps", "depth", "cutoffs", "first_cutoffs",
+                                     "evaluations", "time", "tt_probes", "tt_hits", "stop"])
+
+
+class SearchStats(object):
+    """Collect `MoveStats` for every move searched by an agent.
+
+    The search increments `evaluations`, `cutoffs` and `first_cutoffs`
+    directly; `start_move` resets them and `end_move` stores them in a new
+    record.
+
+    Attributes
+    ----------
+    moves : list<MoveStats>
+        The statistics of each move, in the order the moves were made.
+    """
+    def __init__(self):
+        self.moves = []
+        self.evaluations = 0
+        self.cutoffs = 0
+        self.first_cutoffs = 0
+        self._start = 0.
+        self._tt_probes = 0
+        self._tt_hits = 0
+
+    def start_move(self, tt=None):
+        """Start counting the search of a new move, which uses the
+        transposition table `tt` if one is given.
+        """
+        self.evaluations = 0
+        self.cutoffs = 0
+        self.first_cutoffs = 0
+        self._tt_probes = tt.probes if tt is not None else 0
+        self._tt_hits = tt.hits if tt is not None else 0
+        self._start = time.perf_counter()
+
+    def end_move(self, nodes, depth, stop, tt=None):
+        """Record the statistics of the move started by `start_move`, given
+        the nodes searched, the deepest completed iteration and the reason
+        the search stopped.
+        """
+        elapsed = time.perf_counter() - self._start
+        tt_probes = tt.probes - self._tt_probes if tt is not None else 0
+        tt_hits = tt.hits - self._tt_hits if tt is not None else 0
+        self.moves.append(MoveStats(nodes, nodes / elapsed if elapsed > 0 else 0., depth,
+                                    self.cutoffs, self.first_cutoffs, self.evaluations,
+                                    1000. * elapsed, tt_probes, tt_hits, stop))
+
+
+def summarize(moves):
+    """Return a dict of aggregate statistics over a list of `MoveStats`
+    (e.g., every move an agent made in a tournament).
+    """
+    count = len(moves)
+    nodes = sum(move.nodes for move in moves)
+    elapsed = sum(move.time for move in moves)
+    cutoffs = sum(move.cutoffs for move in moves)
+    probes = sum(move.tt_probes for move in moves)
+    depths = [move.depth for move in moves if move.depth is not None]
+    stops = {}
+    for move in moves:
+        stops[move.stop] = stops.get(move.stop, 0) + 1
+    return {
+        "moves": count,
+        "nodes": nodes / count if count else 0.,
+        "nps": 1000. * nodes / elapsed if elapsed else 0.,
+        "depth": sum(depths) / len(depths) if depths else None,
+        "cutoffs": cutoffs / count if count else 0.,
+        "first_cutoff_rate": sum(move.first_cutoffs for move in moves) / cutoffs if cutoffs else None,
+        "evaluations": sum(move.evaluations for move in moves) / count if count else 0.,
+        "time": elapsed / count if count else 0.,
+        "tt_hit_rate": sum(move.tt_hits for move in moves) / probes if probes else None,
+        "stops": stops,
+    }
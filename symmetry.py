@@ -0,0 +1,72 @@
+"""This file contains the symmetries of the Isolation board: the mirror images
+and rotations that map a board onto itself (8 on square boards, 4 otherwise),
+and the symmetry-reduced key that symmetric positions share. The opening
+book (`opening_book.py`) and the memoized perft (`perft.py`) use them.
+
+Only the methods of the `isolation.Board` API are used, so loading this file
+loads no search code.
+"""
+
+
+def symmetries(width, height):
+    """Return the coordinate transforms that map a board of the given size
+    onto itself, as functions from (row, column) to (row, column). The first
+    transform is the identity.
+    """
+    h, w = height - 1, width - 1
+    transforms = [
+        lambda r, c: (r, c),
+        lambda r, c: (h - r, c),
+        lambda r, c: (r, w - c),
+        lambda r, c: (h - r, w - c),
+    ]
+    if width == height:
+        transforms += [
+            lambda r, c: (c, r),
+            lambda r, c: (w - c, h - r),
+            lambda r, c: (c, h - r),
+            lambda r, c: (w - c, r),
+        ]
+    return transforms
+
+
+def inverse(width, height, transform):
+    """Return the inverse of one of the `symmetries` transforms. """
+    cells = [(r, c) for r in range(height) for c in range(width)]
+    mapping = {transform(r, c): (r, c) for r, c in cells}
+    return lambda r, c: mapping[(r, c)]
+
+
+def canonical_key(game):
+    """Return the symmetry-reduced key of a position together with the
+    transform that maps the position onto its canonical orientation.
+
+    The key lists the blocked squares, the active player's square and the
+    inactive player's square of the canonical orientation, so positions that
+    only differ by which seat is to move share an entry as well.
+    """
+    blank = set(game.get_blank_spaces())
+    blocked = [(r, c) for r in range(game.height) for c in range(game.width)
+               if (r, c) not in blank]
+    active = game.get_player_location(game.active_player)
+    inactive = game.get_player_location(game.inactive_player)
+
+    best = None
+    for transform in symmetries(game.width, game.height):
+        key = (sorted(transform(*cell) for cell in blocked),
+               transform(*active) if active else None,
+               transform(*inactive) if inactive else None)
+        if best is None or _sort_key(key) < _sort_key(best[0]):
+            best = (key, transform)
+
+    (cells, active, inactive), transform = best
+    key = "{}|{}|{}".format(
+        ",".join("{}.{}".format(*cell) for cell in cells),
+        "{}.{}".format(*active) if active else "-",
+        "{}.{}".format(*inactive) if inactive else "-")
+    return key, transform
+
+
+def _sort_key(key):
+    cells, active, inactive = key
+    return cells, active or (-1, -1), inactive or (-1, -1)
@@ -0,0 +1,121 @@
+"""This file contains the time manager used by the iterative deepening search
+in `game_agent.py`. An iteration that is still running when the timer
+expires is thrown away, so the manager predicts the cost of the next
+iteration from the node counts of the completed ones and stops deepening
+when that iteration cannot finish in the time that is left.
+"""
+
+# The next iteration is only skipped when even this fraction of its predicted
+# cost exceeds the time left in the budget: the prediction often errs by a
+# factor of 1.5 either way, and an iteration that might finish is worth trying
+SKIP_RATIO = 0.6
+
+# Fraction of the time available for a move that is budgeted in each game
+# phase when phase scaling is enabled: the opening (fewer than OPENING_PLIES
+# moves played), quiet positions, and critical positions in which the player
+# to move has at most CRITICAL_MOBILITY legal moves
+OPENING_PLIES = 4
+CRITICAL_MOBILITY = 3
+OPENING_FACTOR = 0.5
+QUIET_FACTOR = 0.75
+CRITICAL_FACTOR = 1.0
+
+
+class TimeManager(object):
+    """Decide whether iterative deepening should start another iteration.
+
+    The cost of the next iteration is predicted as the time of the last one
+    multiplied by the effective branching factor: the geometric mean of the
+    node count ratios of the last two pairs of consecutive iterations, which
+    evens out the odd-even effect of alpha-beta search.
+
+    Parameters
+    ----------
+    phase_scaling : bool (optional)
+        If True, only a fraction of the available time is budgeted for each
+        move depending on the game phase (see `phase_factor`), so that the
+        search spends relatively more time in critical positions. The search
+        stops when the budget is spent (see `stop_at`), even in the middle of
+        an iteration. Otherwise every move may use all of the available time.
+
+    Attributes
+    ----------
+    budget : float
+        The number of milliseconds the current move may spend searching.
+
+    stop_at : float
+        The number of milliseconds left on the timer of the current move when
+        its budget is spent.
+
+    skipped : int
+        The number of iterations that were not started because they were
+        predicted not to finish within the budget.
+    """
+    def __init__(self, phase_scaling=False):
+        self.phase_scaling = phase_scaling
+        self.budget = float("inf")
+        self.stop_at = 0.
+        self.skipped = 0
+        self._time_left = None
+        self._start = 0.
+        self._nodes = []
+        self._times = []
+
+    def phase_factor(self, game):
+        """Return the fraction of the available time budgeted for a move in
+        the input position.
+        """
+        if game.move_count < OPENING_PLIES:
+            return OPENING_FACTOR
+        if sum(1 for _ in game.iter_legal_moves()) <= CRITICAL_MOBILITY:
+            return CRITICAL_FACTOR
+        return QUIET_FACTOR
+
+    def new_search(self, game, time_left, threshold):
+        """Start budgeting the search of a move.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            The position to search
+
+        time_left : callable
+            The timer of the move, which returns the number of milliseconds
+            left
+
+        threshold : float
+            The number of milliseconds the search must leave on the timer
+        """
+        self._time_left = time_left
+        self._start = time_left()
+        self.budget = self._start - threshold
+        self.stop_at = threshold
+        if self.phase_scaling and self.budget < float("inf"):
+            self.budget *= self.phase_factor(game)
+            self.stop_at = self._start - self.budget
+        self._nodes = []
+        self._times = []
+
+    def iteration_done(self, nodes):
+        """Record the completion of an iteration, given the total number of
+        nodes searched for the move so far.
+        """
+        elapsed = self._start - self._time_left()
+        self._nodes.append(nodes - sum(self._nodes))
+        self._times.append(elapsed - sum(self._times))
+
+    def next_iteration_fits(self):
+        """Return False if the next iteration is predicted to run past the
+        budget, and True otherwise.
+        """
+        if len(self._nodes) < 3 or self.budget == float("inf"):
+            return True
+        n = self._nodes
+        if n[-3] <= 0:
+            return True
+        branching = (n[-1] / n[-3]) ** 0.5
+        elapsed = sum(self._times)
+        if elapsed + SKIP_RATIO * self._times[-1] * branching <= self.budget:
+            return True
+        self.skipped += 1
+        return False
@@ -11,17 +11,25 @@ players, and the players play each match twice -- once as the first player and
 once as the second player.  Randomizing the openings and switching the player
 order corrects for imbalances due to both starting position and initiative.
 """
+import argparse
+import copy
 import itertools
+import json
+import math
+import os
 import random
 import warnings
 
 from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 
 from isolation import Board
 from sample_players import (RandomPlayer, open_move_score,
                             improved_score, center_score)
 from game_agent import (MinimaxPlayer, AlphaBetaPlayer, custom_score,
                         custom_score_2, custom_score_3)
+from mcts import MCTSPlayer
+from search_stats import MoveStats, summarize
 
 NUM_MATCHES = 5  # number of matches against each opponent
 TIME_LIMIT = 150  # number of milliseconds before timeout
@@ -36,36 +44,247 @@ game_agent.py.
 
 Agent = namedtuple("Agent", ["player", "name"])
 
+# The outcome of a sequential probability ratio test between two agents: the
+# accepted hypothesis ("H1" if the agent is stronger than its opponent, "H0"
+# if it is not, or None if the game cap was reached first), the number of
+# games played, the agent's wins and losses, and the final log-likelihood ratio
+SPRTResult = namedtuple("SPRTResult", ["decision", "games", "wins", "losses", "llr"])
+
+# A single game to play: the two players, the opening moves applied before
+# the players take over, the seed for the random number generator, the
+# per-move time limit (None for untimed games between budgeted agents), and
+# the id and (player 1, player 2) agent names under which the game is logged
+GameSpec = namedtuple("GameSpec", ["player_1", "player_2", "opening", "seed", "time_limit",
+                                   "game_id", "names"], defaults=(None, None))
+
+# The outcome of a game: whether player 1 won, the termination reason and
+# move history reported by `Board.play`, the milliseconds taken by each move,
+# and the `search_stats.MoveStats` of each player's moves (None for a player
+# without statistics)
+GameResult = namedtuple("GameResult", ["player_1_won", "termination", "history", "move_times",
+                                       "stats"], defaults=((None, None),))
+
+
+def play_game(spec):
+    """Play one game described by a `GameSpec` and return its `GameResult`.
+
+    The global random number generator is seeded from the spec and the game
+    is played by fresh copies of the players (so search tables do not carry
+    over from earlier games); a game therefore plays out the same way
+    whether it runs in this process or in a worker. With untimed games and
+    node- or depth-budgeted agents, that makes results fully reproducible.
+    """
+    random.seed(spec.seed)
+    player_1, player_2 = copy.deepcopy((spec.player_1, spec.player_2))
+    game = Board(player_1, player_2)
+    for move in spec.opening:
+        game.apply_move(move)
+    move_times = []
+    winner, history, termination = game.play(time_limit=spec.time_limit, move_times=move_times)
+    # A pondering agent would otherwise keep searching into the next game
+    for player in (player_1, player_2):
+        if getattr(player, "ponder", False):
+            player.stop_pondering()
+    stats = tuple(player.stats.moves if getattr(player, "stats", None) is not None else None
+                  for player in (player_1, player_2))
+    return GameResult(winner is player_1, termination, history, move_times, stats)
+
+
+class ResultLog(object):
+    """Stream a JSONL record of every finished game to a file, so that the
+    results of a long tournament survive a crash and can be analysed offline.
+
+    Each record holds the game id, the agent names in seat order, the
+    opening moves, the seed and time limit, the winner, the termination
+    reason, the move history after the opening, the per-move times in
+    milliseconds, and the search statistics of the players that keep them.
+
+    Parameters
+    ----------
+    path : str
+        The file to write the records to
+
+    resume : bool (optional)
+        If True, the records already in the file are loaded into `records`
+        and new records are appended; otherwise the file is overwritten.
+    """
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.records = {}
+        if resume and os.path.exists(path):
+            with open(path) as f:
+                text = f.read()
+            for line in text.splitlines():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # a record cut short by an interrupted run
+                self.records[record["game"]] = record
+            self._file = open(path, "a")
+            if text and not text.endswith("\n"):
+                self._file.write("\n")
+        else:
+            self._file = open(path, "w")
+
+    def result(self, spec):
+        """Return the recorded `GameResult` of a game, or None.
+
+        Raises ValueError if the record of the game id was played from a
+        different opening, seed, time limit or agents than `spec` (e.g., a
+        run resumed with another --seed), rather than mixing its result into
+        a different tournament.
+        """
+        record = self.records.get(spec.game_id)
+        if record is None:
+            return None
+        names = spec.names or (None, None)
+        expected = ([list(move) for move in spec.opening], spec.seed, spec.time_limit,
+                    names[0], names[1])
+        recorded = (record["opening"], record["seed"], record["time_limit"],
+                    record["player_1"], record["player_2"])
+        if recorded != expected:
+            raise ValueError("game {} in {} was played with a different opening, seed, time "
+                             "limit or agents; resume with the arguments of the original run"
+                             .format(spec.game_id, self.path))
+        stats = tuple(None if moves is None else [MoveStats(**move) for move in moves]
+                      for moves in record.get("stats", (None, None)))
+        return GameResult(record["winner_seat"] == 1, record["termination"],
+                          record["history"], record["move_times"], stats)
+
+    def write(self, spec, result):
+        """Append the record of a finished game and flush it to disk. """
+        names = spec.names or (None, None)
+        record = {
+            "game": spec.game_id,
+            "player_1": names[0],
+            "player_2": names[1],
+            "opening": [list(move) for move in spec.opening],
+            "seed": spec.seed,
+            "time_limit": spec.time_limit,
+            "winner": names[0] if result.player_1_won else names[1],
+            "winner_seat": 1 if result.player_1_won else 2,
+            "termination": result.termination,
+            "history": [list(move) for move in result.history],
+            "move_times": [round(t, 3) for t in result.move_times],
+        }
+        if any(moves is not None for moves in result.stats):
+            record["stats"] = [None if moves is None else [move._asdict() for move in moves]
+                               for moves in result.stats]
+        self.records[spec.game_id] = record
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def _detached(player):
+    """Return a shallow copy of a player that can be sent to a worker
+    process; the `time_left` callable left over from an earlier move (a
+    lambda) cannot be pickled.
+    """
+    if getattr(player, "time_left", None) is None:
+        return player
+    player = copy.copy(player)
+    player.time_left = None
+    return player
+
+
+def fair_game_specs(cpu_agent, test_agents, num_matches, rng=random, time_limit=TIME_LIMIT,
+                    round_id="", first_match=0):
+    """Return the `GameSpec`s of `num_matches` "fair" matches between the cpu
+    agent and each test agent: every match starts from a random opening move
+    and response, and is played twice with the agents swapping seats.
+
+    Games get the deterministic id "<round_id>/<match>/<test agent>/<seat>",
+    where matches are numbered from `first_match` and seat is the test
+    agent's seat, so that a resumed run finds the games it already played.
+    """
+    specs = []
+    for match in range(first_match, first_match + num_matches):
 
-def play_round(cpu_agent, test_agents, win_counts, num_matches):
+        # initialize all games with a random move and response
+        opening = []
+        game = Board(cpu_agent.player, test_agents[0].player)
+        for _ in range(2):
+            move = rng.choice(game.get_legal_moves())
+            game.apply_move(move)
+            opening.append(move)
+
+        for agent in test_agents:
+            game_id = "{}/{}/{}/".format(round_id, match, agent.name)
+            specs.append(GameSpec(cpu_agent.player, agent.player, opening,
+                                  rng.getrandbits(32), time_limit, game_id + "2",
+                                  (cpu_agent.name, agent.name)))
+            specs.append(GameSpec(agent.player, cpu_agent.player, opening,
+                                  rng.getrandbits(32), time_limit, game_id + "1",
+                                  (agent.name, cpu_agent.name)))
+    return specs
+
+
+def play_games(specs, executor=None, log=None, stats=None):
+    """Return an iterator over the `GameResult`s of the input specs, in order.
+
+    The games are played by the workers of `executor` if one is given, or one
+    after another in this process otherwise. If a `ResultLog` is given, games
+    it already holds are not played again, and every new result is written
+    to it as soon as it is collected. If a `stats` dict is given, the move
+    statistics of each game returned are appended to its list for the agent
+    name that made them.
+    """
+    recorded = [log.result(spec) if log is not None else None for spec in specs]
+    pending = [spec for spec, result in zip(specs, recorded) if result is None]
+    if executor is None:
+        results = map(play_game, pending)
+    else:
+        results = executor.map(play_game, [
+            spec._replace(player_1=_detached(spec.player_1), player_2=_detached(spec.player_2))
+            for spec in pending])
+
+    for spec, result in zip(specs, recorded):
+        if result is None:
+            result = next(results)
+            if log is not None:
+                log.write(spec, result)
+        if stats is not None:
+            for name, moves in zip(spec.names or (), result.stats):
+                if moves is not None:
+                    stats.setdefault(name, []).extend(moves)
+        yield result
+
+
+def play_round(cpu_agent, test_agents, win_counts, num_matches, executor=None, rng=random,
+               time_limit=TIME_LIMIT, log=None, round_id="", stats=None):
     """Compare the test agents to the cpu agent in "fair" matches.
 
     "Fair" matches use random starting locations and force the agents to
     play as both first and second player to control for advantages resulting
     from choosing better opening moves or having first initiative to move.
+
+    If an `executor` (e.g., a `concurrent.futures.ProcessPoolExecutor`) is
+    given, the games are played concurrently by its workers; otherwise they
+    are played one after another in this process. Openings and per-game
+    seeds are drawn from `rng` before any game starts, so both modes play the
+    same games. Every game keeps its own per-move `time_limit` (None for
+    untimed games between node- or depth-budgeted agents). Results are
+    streamed to `log` (see `play_games`) under ids starting with `round_id`,
+    and move statistics are collected in `stats`.
     """
+    specs = fair_game_specs(cpu_agent, test_agents, num_matches, rng, time_limit, round_id)
+    results = play_games(specs, executor, log, stats)
+
     timeout_count = 0
     forfeit_count = 0
-    for _ in range(num_matches):
-
-        games = sum([[Board(cpu_agent.player, agent.player),
-                      Board(agent.player, cpu_agent.player)]
-                    for agent in test_agents], [])
-
-        # initialize all games with a random move and response
-        for _ in range(2):
-            move = random.choice(games[0].get_legal_moves())
-            for game in games:
-                game.apply_move(move)
+    for spec, result in zip(specs, results):
+        winner = spec.player_1 if result.player_1_won else spec.player_2
+        win_counts[winner] += 1
 
-        # play all games and tally the results
-        for game in games:
-            winner, _, termination = game.play(time_limit=TIME_LIMIT)
-            win_counts[winner] += 1
-
-        if termination == "timeout":
+        if result.termination == "timeout":
             timeout_count += 1
-        elif winner not in test_agents and termination == "forfeit":
+        # Only forfeits by a test agent are reported. The baseline's test
+        # `winner not in test_agents` compared a player with `Agent` tuples,
+        # so it counted the cpu agent's forfeits as well
+        elif winner == cpu_agent.player and result.termination == "forfeit":
             forfeit_count += 1
 
     return timeout_count, forfeit_count
@@ -77,8 +296,18 @@ def update(total_wins, wins):
     return total_wins
 
 
-def play_matches(cpu_agents, test_agents, num_matches):
-    """Play matches between the test agent and each cpu_agent individually. """
+def play_matches(cpu_agents, test_agents, num_matches, executor=None, seed=None,
+                 time_limit=TIME_LIMIT, log=None, stats=None):
+    """Play matches between the test agent and each cpu_agent individually.
+
+    The games of each round are spread across the workers of `executor` when
+    one is given (see `play_round`). `seed` makes the openings and games of
+    the whole tournament reproducible, and `time_limit` is the per-move time
+    limit of every game. Finished games are streamed to the `ResultLog` `log`,
+    and games it already holds are counted without being played again. Move
+    statistics are collected per agent name in the `stats` dict.
+    """
+    rng = random.Random(seed)
     total_wins = {agent.player: 0 for agent in test_agents}
     total_timeouts = 0.
     total_forfeits = 0.
@@ -99,7 +328,8 @@ def play_matches(cpu_agents, test_agents, num_matches):
 
         print("{!s:^9}{:^13}".format(idx + 1, agent.name), end="", flush=True)
 
-        counts = play_round(agent, test_agents, wins, num_matches)
+        counts = play_round(agent, test_agents, wins, num_matches, executor, rng, time_limit,
+                            log, "{}-{}".format(idx + 1, agent.name), stats)
         total_timeouts += counts[0]
         total_forfeits += counts[1]
         total_wins = update(total_wins, wins)
@@ -126,33 +356,206 @@ def play_matches(cpu_agents, test_agents, num_matches):
                "legal moves available to play.\n").format(total_forfeits))
 
 
-def main():
+def sprt_bounds(alpha, beta):
+    """Return the (lower, upper) log-likelihood ratio bounds of a sequential
+    probability ratio test: H0 is accepted below the lower bound and H1 above
+    the upper bound, with false positive rate `alpha` and false negative rate
+    `beta`.
+    """
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+def sprt_llr(wins, losses, p0, p1):
+    """Return the log-likelihood ratio of H1 (the win rate is `p1`) against
+    H0 (the win rate is `p0`) after the given numbers of wins and losses.
+    Isolation games cannot be drawn, so every game is a Bernoulli trial.
+    """
+    return wins * math.log(p1 / p0) + losses * math.log((1 - p1) / (1 - p0))
+
+
+def play_sprt(agent, opponent, p0=0.5, p1=0.55, alpha=0.05, beta=0.05, max_games=2000,
+              executor=None, seed=None, time_limit=TIME_LIMIT, batch_size=1, log=None,
+              stats=None):
+    """Play "fair" matches between two agents until a sequential probability
+    ratio test decides whether `agent` wins at least a fraction `p1` of its
+    games against `opponent` (H1) or at most `p0` (H0), or until `max_games`
+    games have been played.
+
+    The test is updated after every game, so a clear difference (or a clear
+    lack of one) is settled after far fewer games than a fixed-size match.
+    Matches are generated `batch_size` at a time and, if `executor` is
+    given, their games are played concurrently; games played beyond the
+    decision point of a batch are ignored. Games are streamed to `log` (see
+    `play_games`), so an interrupted test can be resumed, and move
+    statistics are collected in `stats`.
+
+    Returns
+    -------
+    SPRTResult
+        The accepted hypothesis and the games needed to reach it
+    """
+    if agent.player is opponent.player:
+        raise ValueError("The agents of an SPRT match must be distinct players")
+    lower, upper = sprt_bounds(alpha, beta)
+    rng = random.Random(seed)
+    wins = losses = 0
+    llr = 0.
+    while wins + losses < max_games:
+        num_matches = min(batch_size, (max_games - wins - losses + 1) // 2)
+        specs = fair_game_specs(opponent, [agent], num_matches, rng, time_limit,
+                                "sprt-{}".format(opponent.name), (wins + losses) // 2)
+        for spec, result in zip(specs, play_games(specs, executor, log, stats)):
+            if result.player_1_won == (spec.player_1 is agent.player):
+                wins += 1
+            else:
+                losses += 1
+            llr = sprt_llr(wins, losses, p0, p1)
+            if llr <= lower or llr >= upper:
+                decision = "H1" if llr >= upper else "H0"
+                return SPRTResult(decision, wins + losses, wins, losses, llr)
+            if wins + losses >= max_games:
+                break
+    return SPRTResult(None, wins + losses, wins, losses, llr)
+
+
+def print_stats(stats):
+    """Print a table of the search statistics of each agent, given a dict
+    from agent name to the list of `MoveStats` of its moves.
+    """
+    print("\n{:^74}".format("*************************"))
+    print("{:^74}".format("Search Statistics"))
+    print("{:^74}".format("*************************"))
+    print("{:>12} {:>6} {:>9} {:>9} {:>6} {:>7} {:>7} {:>7}".format(
+        "Agent", "Moves", "Nodes", "Nodes/s", "Depth", "1st cut", "TT hit", "ms"))
+    for name in sorted(stats):
+        summary = summarize(stats[name])
+        print("{:>12} {:>6} {:>9.0f} {:>9.0f} {:>6} {:>7} {:>7} {:>7.1f}".format(
+            name, summary["moves"], summary["nodes"], summary["nps"],
+            "-" if summary["depth"] is None else "{:.1f}".format(summary["depth"]),
+            "-" if summary["first_cutoff_rate"] is None else "{:.0%}".format(summary["first_cutoff_rate"]),
+            "-" if summary["tt_hit_rate"] is None else "{:.0%}".format(summary["tt_hit_rate"]),
+            summary["time"]))
+        print("{:>12} stopped by {}".format("", ", ".join(
+            "{} ({})".format(reason, count) for reason, count in sorted(summary["stops"].items()))))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    parser.add_argument("-p", "--processes", type=int, default=1,
+                        help="number of worker processes playing games in parallel (default: 1)")
+    parser.add_argument("-s", "--seed", type=int, default=None,
+                        help="seed for the openings and games of the tournament")
+    parser.add_argument("-n", "--nodes", type=int, default=None,
+                        help="limit the search agents to this many nodes per move and play untimed games")
+    parser.add_argument("-d", "--depth", type=int, default=None,
+                        help="limit iterative deepening to this depth and play untimed games")
+    parser.add_argument("--mcts", action="store_true",
+                        help="add a Monte Carlo tree search agent (MCTS) to the opponents; with "
+                             "--nodes, it runs that many playouts per move")
+    parser.add_argument("--sprt", nargs=2, metavar=("AGENT", "OPPONENT"), default=None,
+                        help="instead of the tournament, play AGENT against OPPONENT (by name) "
+                             "until a sequential probability ratio test decides between them")
+    parser.add_argument("--sprt-p1", type=float, default=0.55,
+                        help="win rate of AGENT under the alternative hypothesis (default: 0.55)")
+    parser.add_argument("--sprt-alpha", type=float, default=0.05,
+                        help="false positive rate of the test (default: 0.05)")
+    parser.add_argument("--sprt-beta", type=float, default=0.05,
+                        help="false negative rate of the test (default: 0.05)")
+    parser.add_argument("--max-games", type=int, default=2000,
+                        help="stop an inconclusive test after this many games (default: 2000)")
+    parser.add_argument("-o", "--results", metavar="PATH", default=None,
+                        help="stream a JSONL record of every finished game to PATH")
+    parser.add_argument("--stats", action="store_true",
+                        help="collect search statistics and print a summary for each agent")
+    parser.add_argument("--resume", action="store_true",
+                        help="keep the games already recorded in the --results file and "
+                             "only play the missing ones (use the same --seed as before)")
+    args = parser.parse_args(args)
+    if args.resume and args.results is None:
+        parser.error("--resume requires --results")
+    if args.mcts and args.depth is not None and args.nodes is None:
+        parser.error("--mcts cannot be limited by --depth; use --nodes or timed games")
+
+    # With a node or depth budget the games are not timed, so results do not
+    # depend on machine load and reproduce from run to run. The budget only
+    # applies to the iterative deepening agents; the minimax agents already
+    # search to a fixed depth
+    budget = {"node_limit": args.nodes, "depth_limit": args.depth, "stats": args.stats}
+    time_limit = TIME_LIMIT if args.nodes is None and args.depth is None else None
 
     # Define two agents to compare -- these agents will play from the same
     # starting position against the same adversaries in the tournament
     test_agents = [
-        Agent(AlphaBetaPlayer(score_fn=improved_score), "AB_Improved"),
-        Agent(AlphaBetaPlayer(score_fn=custom_score), "AB_Custom"),
-        Agent(AlphaBetaPlayer(score_fn=custom_score_2), "AB_Custom_2"),
-        Agent(AlphaBetaPlayer(score_fn=custom_score_3), "AB_Custom_3")
+        Agent(AlphaBetaPlayer(score_fn=improved_score, **budget), "AB_Improved"),
+        Agent(AlphaBetaPlayer(score_fn=custom_score, **budget), "AB_Custom"),
+        Agent(AlphaBetaPlayer(score_fn=custom_score_2, **budget), "AB_Custom_2"),
+        Agent(AlphaBetaPlayer(score_fn=custom_score_3, **budget), "AB_Custom_3")
     ]
 
     # Define a collection of agents to compete against the test agents
     cpu_agents = [
         Agent(RandomPlayer(), "Random"),
-        Agent(MinimaxPlayer(score_fn=open_move_score), "MM_Open"),
-        Agent(MinimaxPlayer(score_fn=center_score), "MM_Center"),
-        Agent(MinimaxPlayer(score_fn=improved_score), "MM_Improved"),
-        Agent(AlphaBetaPlayer(score_fn=open_move_score), "AB_Open"),
-        Agent(AlphaBetaPlayer(score_fn=center_score), "AB_Center"),
-        Agent(AlphaBetaPlayer(score_fn=improved_score), "AB_Improved")
+        Agent(MinimaxPlayer(score_fn=open_move_score, stats=args.stats), "MM_Open"),
+        Agent(MinimaxPlayer(score_fn=center_score, stats=args.stats), "MM_Center"),
+        Agent(MinimaxPlayer(score_fn=improved_score, stats=args.stats), "MM_Improved"),
+        Agent(AlphaBetaPlayer(score_fn=open_move_score, **budget), "AB_Open"),
+        Agent(AlphaBetaPlayer(score_fn=center_score, **budget), "AB_Center"),
+        Agent(AlphaBetaPlayer(score_fn=improved_score, **budget), "AB_Improved")
     ]
-
-    print(DESCRIPTION)
-    print("{:^74}".format("*************************"))
-    print("{:^74}".format("Playing Matches"))
-    print("{:^74}".format("*************************"))
-    play_matches(cpu_agents, test_agents, NUM_MATCHES)
+    if args.mcts:
+        cpu_agents.append(Agent(MCTSPlayer(node_limit=args.nodes, stats=args.stats), "MCTS"))
+
+    executor = None
+    if args.processes > 1:
+        executor = ProcessPoolExecutor(max_workers=args.processes)
+    log = None
+    if args.results is not None:
+        log = ResultLog(args.results, resume=args.resume)
+    stats = {} if args.stats else None
+
+    if args.sprt is not None:
+        agents = {}
+        for agent in test_agents + cpu_agents:
+            agents.setdefault(agent.name, agent)
+        unknown = [name for name in args.sprt if name not in agents]
+        if unknown:
+            parser.error("unknown agent(s): {} (choose from {})".format(
+                ", ".join(unknown), ", ".join(agents)))
+        agent, opponent = (agents[name] for name in args.sprt)
+        if agent.player is opponent.player:
+            opponent = Agent(copy.deepcopy(opponent.player), opponent.name)
+
+        print("{:^74}".format("*************************"))
+        print("{:^74}".format("SPRT: {} vs {}".format(agent.name, opponent.name)))
+        print("{:^74}".format("*************************"))
+        result = play_sprt(agent, opponent, p1=args.sprt_p1, alpha=args.sprt_alpha,
+                           beta=args.sprt_beta, max_games=args.max_games, executor=executor,
+                           seed=args.seed, time_limit=time_limit, batch_size=args.processes,
+                           log=log, stats=stats)
+        if result.decision == "H1":
+            verdict = "{} is stronger (win rate >= {:.0%})".format(agent.name, args.sprt_p1)
+        elif result.decision == "H0":
+            verdict = "{} is not stronger (win rate <= 50%)".format(agent.name)
+        else:
+            verdict = "inconclusive"
+        print("\nGames: {}   Won: {}   Lost: {}   LLR: {:.2f} {}".format(
+            result.games, result.wins, result.losses, result.llr,
+            "[{:.2f}, {:.2f}]".format(*sprt_bounds(args.sprt_alpha, args.sprt_beta))))
+        print("Result: {}".format(verdict))
+    else:
+        print(DESCRIPTION)
+        print("{:^74}".format("*************************"))
+        print("{:^74}".format("Playing Matches"))
+        print("{:^74}".format("*************************"))
+        play_matches(cpu_agents, test_agents, NUM_MATCHES, executor, args.seed, time_limit, log,
+                     stats)
+    if stats:
+        print_stats(stats)
+
+    if executor is not None:
+        executor.shutdown()
+    if log is not None:
+        log.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,179 @@
+"""This file contains a bounded transposition table used by the search agents
+in `game_agent.py` to reuse the results of positions that were already
+searched, either through a different move order or during an earlier
+iteration of iterative deepening.
+"""
+
+# Bound types describing how a stored score relates to the true minimax value
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Replacement policies
+TWO_TIER = "two-tier"
+DEPTH_PREFERRED = "depth"
+ALWAYS_REPLACE = "always"
+
+
+class TranspositionTable(object):
+    """Fixed-size hash table of search results keyed by a 64-bit position key
+    (e.g., `isolation.Board.zobrist_key`).
+
+    Each entry is a tuple ``(key, depth, score, bound, move, generation)``.
+    The table is split into buckets of two slots: a depth-preferred slot that
+    keeps the deepest result seen for the bucket, and an always-replace slot
+    that holds the most recent result that did not qualify for the first one.
+    Entries left over from an earlier search (see `new_search`) are always
+    replaceable, so stale deep results do not fill the table.
+
+    Parameters
+    ----------
+    max_entries : int (optional)
+        The maximum number of entries held by the table.
+
+    policy : str (optional)
+        The replacement policy: "two-tier" (depth-preferred slot backed by an
+        always-replace slot), "depth" (depth-preferred only) or "always"
+        (always replace).
+    """
+    def __init__(self, max_entries=2**16, policy=TWO_TIER):
+        if policy not in (TWO_TIER, DEPTH_PREFERRED, ALWAYS_REPLACE):
+            raise ValueError("Unknown replacement policy: {}".format(policy))
+        self.policy = policy
+        self.num_buckets = max(1, max_entries // 2 if policy == TWO_TIER else max_entries)
+        self.generation = 0
+        self.clear()
+
+    def clear(self):
+        """Remove every entry and reset the statistics. """
+        self._deep = [None] * self.num_buckets
+        self._recent = [None] * self.num_buckets if self.policy == TWO_TIER else None
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.overwrites = 0
+        self.rejected = 0
+
+    def new_search(self):
+        """Mark every entry currently in the table as belonging to an earlier
+        search, which makes them replaceable regardless of their depth.
+        """
+        self.generation += 1
+
+    def probe(self, key):
+        """Return the entry stored for the input key, or None.
+
+        Parameters
+        ----------
+        key : int
+            The 64-bit key of the position
+
+        Returns
+        -------
+        tuple or None
+            The ``(key, depth, score, bound, move, generation)`` entry
+        """
+        self.probes += 1
+        idx = key % self.num_buckets
+        entry = self._deep[idx]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        if self._recent is not None:
+            entry = self._recent[idx]
+            if entry is not None and entry[0] == key:
+                self.hits += 1
+                return entry
+        return None
+
+    def store(self, key, depth, score, bound, move):
+        """Record the result of searching a position.
+
+        Parameters
+        ----------
+        key : int
+            The 64-bit key of the position
+
+        depth : int
+            The remaining depth the position was searched to
+
+        score : float
+            The score found by the search
+
+        bound : int
+            One of EXACT, LOWER (score is a lower bound of the true value) or
+            UPPER (score is an upper bound of the true value)
+
+        move : (int, int)
+            The best move found for the position
+        """
+        self.stores += 1
+        idx = key % self.num_buckets
+        entry = (key, depth, score, bound, move, self.generation)
+        current = self._deep[idx]
+        if (current is None or current[0] == key or self.policy == ALWAYS_REPLACE or
+                depth >= current[1] or current[5] != self.generation):
+            if current is not None and current[0] != key:
+                self.overwrites += 1
+            self._deep[idx] = entry
+        elif self._recent is not None:
+            if self._recent[idx] is not None and self._recent[idx][0] != key:
+                self.overwrites += 1
+            self._recent[idx] = entry
+        else:
+            self.rejected += 1
+
+    def lookup(self, key, depth, alpha, beta):
+        """Probe the table for a position about to be searched to `depth`
+        plies with the (alpha, beta) window.
+
+        Returns
+        -------
+        ((int, int) or None, float or None)
+            The stored best move of the position (None if it is not in the
+            table), and the stored score if it decides the search: a score
+            from a search at least as deep that is exact or a bound outside
+            the window; otherwise None
+        """
+        entry = self.probe(key)
+        if entry is None:
+            return None, None
+        score, bound = entry[2], entry[3]
+        if entry[1] >= depth and (bound == EXACT or (score >= beta if bound == LOWER else score <= alpha)):
+            return entry[4], score
+        return entry[4], None
+
+    def record(self, key, depth, score, alpha, beta, move):
+        """Store the result of searching a position with the (alpha, beta)
+        window: a score at or below alpha is an upper bound, a score at or
+        above beta a lower bound, and any other score is exact.
+        """
+        if score <= alpha:
+            bound = UPPER
+        elif score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.store(key, depth, score, bound, move)
+
+    def __len__(self):
+        count = sum(1 for entry in self._deep if entry is not None)
+        if self._recent is not None:
+            count += sum(1 for entry in self._recent if entry is not None)
+        return count
+
+    def stats(self):
+        """Return a dictionary of the table usage counters: probes, hits,
+        misses, hit rate, stores, overwrites of other positions, stores
+        rejected by the depth-preferred policy, and filled entries.
+        """
+        return {
+            "probes": self.probes,
+            "hits": self.hits,
+            "misses": self.probes - self.hits,
+            "hit_rate": self.hits / self.probes if self.probes else 0.,
+            "stores": self.stores,
+            "overwrites": self.overwrites,
+            "rejected": self.rejected,
+            "entries": len(self),
+        }